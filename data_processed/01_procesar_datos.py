@@ -1,162 +1,133 @@
-# %% 
-import pandas as pd
+# %%
+import argparse
+import functools
 import os
+import sys
 
 # --- CONFIGURACIÓN ---
 # Ruta al archivo GIGANTE
 file_path = r"Z:\CENSO_2024\Bases-Finales-CPV2024SV-CSV\BasedeDatosdePoblacionCPV2024SV.csv"
+# Base de viviendas (agua, luz, materiales, internet del hogar); si no está, se omite
+vivienda_path = r"Z:\CENSO_2024\Bases-Finales-CPV2024SV-CSV\BasedeDatosdeViviendaCPV2024SV.csv"
 output_folder = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO"
-
-# Crear carpeta si no existe
-os.makedirs(output_folder, exist_ok=True)
-
-# --- 1. CARGA DE DATOS ---
-print("⏳ Cargando el dataset maestro (Esto puede tardar)...")
-try:
-    df_censo = pd.read_csv(file_path)
-    print(f"✅ Datos cargados: {len(df_censo):,} registros.")
-except FileNotFoundError:
-    print(f"❌ ERROR: No encuentro el archivo en {file_path}")
-    print("Asegurate de estar conectado al servidor o tener el archivo local.")
-    exit()
-
-# --- 2. PROCESAMIENTO: DEMOGRAFÍA (Mapa y Dona) ---
-print("⚙️ Procesando Demografía...")
-
-def calc_stats(x):
-    total = x['COD_PER'].count()
-    # Asumiendo 1=Hombre, 2=Mujer (Verifica tu diccionario)
-    mujeres = x[x['P02_2_SEXO'] == 2]['COD_PER'].count()
-    hombres = x[x['P02_2_SEXO'] == 1]['COD_PER'].count()
-    return pd.Series({'Poblacion': total, 'Mujeres': mujeres, 'Hombres': hombres})
-
-# Agrupar por Departamento
-df_deptos = df_censo.groupby('DEPTO').apply(calc_stats).reset_index()
-
-# Agregar Nombres de Departamentos (Para que ya vaya limpio)
-codigos_deptos = {
-    1: "Ahuachapán", 2: "SantaAna", 3: "Sonsonate", 4: "Chalatenango", 
-    5: "LaLibertad", 6: "San Salvador", 7: "Cuscatlán", 8: "LaPaz", 
-    9: "Cabañas", 10: "SanVicente", 11: "Usulután", 12: "SanMiguel", 
-    13: "Morazán", 14: "LaUnión"
-}
-df_deptos['Nombre_Depto'] = df_deptos['DEPTO'].map(codigos_deptos)
-
-# --- 3. PROCESAMIENTO: EDADES (Histograma) ---
-print("⚙️ Procesando Edades...")
-# Solo contamos cuánta gente tiene cada edad (0 años: 50k, 1 año: 48k...)
-df_edades = df_censo['P02_3_EDAD'].value_counts().reset_index()
-df_edades.columns = ['Edad', 'Frecuencia']
-# Limpieza básica de errores (solo números)
-df_edades['Edad'] = pd.to_numeric(df_edades['Edad'], errors='coerce')
-df_edades = df_edades.dropna().sort_values('Edad')
-
-# --- 4. EXPORTAR DATOS LIGEROS ---
-print("💾 Guardando archivos optimizados...")
-
-df_deptos.to_csv(f"{output_folder}/resumen_deptos.csv", index=False)
-df_edades.to_csv(f"{output_folder}/resumen_edades.csv", index=False)
-
-print("🚀 ¡LISTO! Archivos generados en folder 'data_processed'.")
-print("Ahora puedes correr el script de visualización instantáneamente.")
-
-# ==========================================
-# --- NUEVO MÓDULO: EDUCACIÓN E IDIOMA (LÓGICA FINAL) ---
-# ==========================================
-print("⚙️ Procesando Módulo de Educación...")
-
-# 1. Definir la Función basada en la IMAGEN P10_1_GRADO_APROBADO
-def clasificar_nivel(valor):
+# Copia columnar (Parquet por DEPTO) que se crea la primera vez; None = leer siempre el CSV
+parquet_folder = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO_parquet"
+# Cubo censal para cruces arbitrarios (solo con --cubo; ver censo_cubo.py)
+cubo_file = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO_cubo\cubo_censo.npz"
+
+
+def reportar(i, total_registros):
+    print(f"   ⚙️ Bloque {i}: {total_registros:,} registros procesados")
+
+
+# El "if __name__" es obligatorio para el modo paralelo en Windows:
+# cada proceso hijo importa este archivo y NO debe volver a correr el pipeline.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procesa el CENSO 2024 y genera los resumen_*.csv")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos en paralelo (1 = en serie, 0 = todos los núcleos)")
+    parser.add_argument("--perfil", choices=["cprofile", "pyinstrument"], default=None,
+                        help="Guarda además un perfil por etapa en reportes/perfiles/")
+    parser.add_argument("--entrada", default=None,
+                        help="Otra fuente del CSV (también .gz/.bz2/.zst/.zip); '-' = leer de la entrada estándar")
+    parser.add_argument("--cubo", action="store_true",
+                        help="Construye y guarda el cubo censal; los resúmenes salen de él")
+    # parse_known_args: así también corre desde la ventana interactiva (# %%)
+    args, _ = parser.parse_known_args()
+
+    # Los módulos del censo (pandas, numpy, pyarrow...) se importan DESPUÉS de leer los
+    # argumentos: "--help" (o "censo.py procesar --help") responde al instante
+    from censo_carga import abrir_censo, acumular, columnas_del_censo, es_ruta, TAMANO_BLOQUE
+    from censo_agregados import agregar, construir_resumenes, guardar_resumenes
+    from censo_paralelo import agregar_en_paralelo
+    from censo_cubo import construir_cubo, combinar_cubos, resumenes_desde_cubo
+    from censo_territorio import (agregar_con_municipios, combinar_con_municipios, resumen_municipios,
+                                  COLUMNA_MUNICIPIO, COLUMNAS_MUNICIPIOS)
+    from censo_diccionario import Validador
+    from censo_estadistica import intervalos_deptos, intervalos_municipios
+    from censo_vivienda import procesar_vivienda, COLUMNAS_PERSONAS, LLAVE_VIVIENDA
+    from censo_instrumentacion import Reporte
+
+    # Ej. en Linux:  zstdcat censo.csv.zst | python 01_procesar_datos.py --entrada -
+    if args.entrada:
+        file_path = sys.stdin.buffer if args.entrada == '-' else args.entrada
+    # Tiempos, CPU, filas y RAM por etapa -> reportes/corridas.ndjson
+    reporte = Reporte("01_procesar_datos.py", perfil=args.perfil)
+
+    # Crear carpeta si no existe
+    os.makedirs(output_folder, exist_ok=True)
+
+    # --- 1. CARGA + AGREGACIÓN EN UNA SOLA PASADA ---
+    # Cada bloque se reduce a conteos por Depto x Edad x Grado (ver censo_agregados.py);
+    # los bloques se suman y de ahí salen TODOS los resumen_*.csv.
+    # Con --cubo se construye el cubo censal (todas las combinaciones) en lugar de la tabla base
+    agregador, combinar = (construir_cubo, combinar_cubos) if args.cubo else (agregar, acumular)
     try:
-        c = int(valor)
-    except:
-        return "Ignorado"
-
-    # --- LÓGICA EXACTA SEGÚN TU DICCIONARIO ---
-    if c == 0:
-        return "Ninguno"        # Código 0
-    elif 1 <= c <= 3:
-        return "Inicial"        # Códigos 1, 2, 3 (Parvularia)
-    elif 4 <= c <= 9:
-        return "Especial"       # Códigos 4 al 9 (Educación Especial)
-    elif 11 <= c <= 19:
-        return "Básica"         # Códigos 11 al 19 (1° a 9° Grado)
-    elif 21 <= c <= 29:
-        return "Media"          # Códigos 21 al 24 (Bachillerato)
-    elif c >= 30:
-        return "Superior"       # Series 30 (Técnico), 40 (Univ), 50 (Maestría), 60 (Doctorado)
+        # Si el CSV trae el código de municipio, en la misma pasada sale también resumen_municipios.csv
+        # (en un flujo no se puede mirar el encabezado antes sin consumirlo)
+        hay_municipios = es_ruta(file_path) and COLUMNA_MUNICIPIO in columnas_del_censo(file_path, parquet_folder)
+        columnas = COLUMNAS_MUNICIPIOS if hay_municipios else None
+        if hay_municipios:
+            agregador = functools.partial(agregar_con_municipios, agregador=agregador)
+            combinar = functools.partial(combinar_con_municipios, combinar=combinar)
+
+        if args.workers == 1:
+            print(f"⏳ Leyendo el dataset maestro en bloques de {TAMANO_BLOQUE:,} filas...")
+            # De paso se revisa que los códigos estén dentro de lo que dice el diccionario
+            validador = Validador()
+            bloques = validador.observar(abrir_censo(file_path, parquet_folder, columnas))
+            resultado, total_registros = agregador(bloques, reportar, reporte)
+            validador.imprimir()
+        else:
+            workers = args.workers or os.cpu_count()
+            print(f"⏳ Leyendo el dataset maestro con {workers} procesos en paralelo...")
+            with reporte.etapa('agregacion_paralela') as e:
+                resultado, total_registros = agregar_en_paralelo(file_path, parquet_folder, workers,
+                                                                 al_avanzar=reportar, agregador=agregador,
+                                                                 combinar=combinar, columnas=columnas)
+                e['filas_salida'] = len(resultado[0] if hay_municipios else resultado)
+        base, municipios = resultado if hay_municipios else (resultado, None)
+        print(f"✅ Datos procesados: {total_registros:,} registros.")
+    except FileNotFoundError:
+        print(f"❌ ERROR: No encuentro el archivo en {file_path}")
+        print("Asegurate de estar conectado al servidor o tener el archivo local.")
+        exit()
+
+    # --- 2. RESÚMENES: DEMOGRAFÍA, EDADES, EDUCACIÓN, INGLÉS Y TIC ---
+    print("⚙️ Generando resúmenes (Demografía, Edades, Educación, Inglés, TIC)...")
+    if args.cubo:
+        base.guardar(cubo_file)
+        print(f"🧊 Cubo censal guardado en {cubo_file}")
+        with reporte.etapa('resumenes_cubo'):
+            resumenes = resumenes_desde_cubo(base)
     else:
-        return "Ignorado"
-
-# 2. Filtrar y Limpiar
-# Forzamos numérico en EDAD
-df_censo['P02_3_EDAD'] = pd.to_numeric(df_censo['P02_3_EDAD'], errors='coerce')
-# IMPORTANTE: Filtrar niños muy pequeños para no inflar "Ninguno"
-df_educ = df_censo[df_censo['P02_3_EDAD'] >= 4].copy()
-
-# 3. Aplicar la clasificación
-col_grado = pd.to_numeric(df_educ['P10_1_GRADO_APROBADO'], errors='coerce').fillna(-1)
-df_educ['Nivel_Educativo'] = col_grado.apply(clasificar_nivel)
-
-# 4. Calcular Idioma Inglés
-col_ingles = pd.to_numeric(df_educ['P12_3_A_ENG'], errors='coerce')
-df_educ['Habla_Ingles'] = (col_ingles == 1).astype(int)
-
-# 5. Generar Tabla Resumen 1: Educación
-resumen_educacion = df_educ.groupby(['DEPTO', 'Nivel_Educativo']).size().reset_index(name='Conteo')
-resumen_educacion['Nombre_Depto'] = resumen_educacion['DEPTO'].map(codigos_deptos)
-
-# 6. Generar Tabla Resumen 2: Inglés
-resumen_ingles = df_educ.groupby('DEPTO').agg(
-    Poblacion_4plus=('COD_PER', 'count'),
-    Hablantes_Ingles=('Habla_Ingles', 'sum')
-).reset_index()
-
-resumen_ingles['Pct_Ingles'] = (resumen_ingles['Hablantes_Ingles'] / resumen_ingles['Poblacion_4plus']) * 100
-resumen_ingles['Nombre_Depto'] = resumen_ingles['DEPTO'].map(codigos_deptos)
-
-# --- GUARDAR (Con utf-8-sig para las tildes) ---
-print("💾 Guardando archivos de Educación Corregidos...")
-resumen_educacion.to_csv(f"{output_folder}/resumen_educacion.csv", index=False, encoding='utf-8-sig')
-resumen_ingles.to_csv(f"{output_folder}/resumen_ingles.csv", index=False, encoding='utf-8-sig')
-
-# ==========================================
-# --- MÓDULO: BRECHA DIGITAL COMPLETO ---
-# ==========================================
-print("⚙️ Procesando todas las variables TIC...")
-
-# 1. Filtramos población > 10 años
-df_tic = df_censo[pd.to_numeric(df_censo['P02_3_EDAD'], errors='coerce') >= 10].copy()
-
-# 2. Función de limpieza (1=Sí, resto=0)
-def limpiar_tic(columna):
-    return (pd.to_numeric(columna, errors='coerce') == 1).astype(int)
-
-# Procesamos todas las variables de tus imágenes
-df_tic['Usa_PC']         = limpiar_tic(df_tic['P14_1_USO_TIC_PC'])
-df_tic['Usa_Laptop']     = limpiar_tic(df_tic['P14_2_USO_TIC_LAPTOP'])
-df_tic['Usa_Tablet']     = limpiar_tic(df_tic['P14_3_USO_TIC_TABLET'])
-df_tic['Usa_Smartphone'] = limpiar_tic(df_tic['P14_4_USO_TIC_SMARTPHONE'])
-df_tic['Usa_Cel_Basico'] = limpiar_tic(df_tic['P14_5_USO_TIC_CEL'])
-df_tic['Usa_Internet']   = limpiar_tic(df_tic['P14_6_USO_TIC_INTERNET'])
-
-# 3. Generar Tabla Resumen por Departamento
-resumen_tic = df_tic.groupby('DEPTO').agg(
-    Total_Pob=('COD_PER', 'count'),
-    Internet=('Usa_Internet', 'sum'),
-    Smartphone=('Usa_Smartphone', 'sum'),
-    Laptop=('Usa_Laptop', 'sum'),
-    PC_Escritorio=('Usa_PC', 'sum'),
-    Tablet=('Usa_Tablet', 'sum'),
-    Cel_Basico=('Usa_Cel_Basico', 'sum')
-).reset_index()
-
-# 4. Calcular Porcentajes
-cols_tic = ['Internet', 'Smartphone', 'Laptop', 'PC_Escritorio', 'Tablet', 'Cel_Basico']
-for col in cols_tic:
-    resumen_tic[f'Pct_{col}'] = (resumen_tic[col] / resumen_tic['Total_Pob']) * 100
-
-resumen_tic['Nombre_Depto'] = resumen_tic['DEPTO'].map(codigos_deptos)
-
-# Guardar
-resumen_tic.to_csv(f"{output_folder}/resumen_tic_completo.csv", index=False, encoding='utf-8-sig')
\ No newline at end of file
+        resumenes = construir_resumenes(base, reporte)
+    if municipios is not None:
+        with reporte.etapa('resumen_municipios', filas_entrada=len(municipios)) as e:
+            resumenes['resumen_municipios.csv'] = resumen_municipios(municipios)
+            e['filas_salida'] = len(resumenes['resumen_municipios.csv'])
+
+    # Vivienda unida a las personas por la llave de la vivienda (ver censo_vivienda.py).
+    # Es otra pasada, pero solo con 5 columnas (del Parquet si existe)
+    if (es_ruta(file_path) and os.path.exists(vivienda_path)
+            and LLAVE_VIVIENDA in columnas_del_censo(file_path, parquet_folder)):
+        print("🏠 Uniendo la base de viviendas con la de población...")
+        personas = abrir_censo(file_path, parquet_folder, COLUMNAS_PERSONAS)
+        resumenes['resumen_vivienda.csv'] = procesar_vivienda(vivienda_path, personas, reporte)
+
+    # Error estándar e intervalos (Wilson y bootstrap) de cada Pct_* (ver censo_estadistica.py)
+    with reporte.etapa('intervalos') as e:
+        resumenes['resumen_intervalos.csv'] = intervalos_deptos(resumenes)
+        if municipios is not None:
+            resumenes['resumen_intervalos_municipios.csv'] = intervalos_municipios(resumenes['resumen_municipios.csv'])
+        e['filas_salida'] = len(resumenes['resumen_intervalos.csv'])
+
+    # --- 3. EXPORTAR DATOS LIGEROS (utf-8-sig para las tildes donde aplica) ---
+    print("💾 Guardando archivos optimizados...")
+    guardar_resumenes(resumenes, output_folder, reporte)
+
+    reporte.guardar()
+    reporte.imprimir()
+
+    print("🚀 ¡LISTO! Archivos generados en folder 'data_processed'.")
+    print("Ahora puedes correr el script de visualización instantáneamente.")
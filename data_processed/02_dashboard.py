@@ -1,13 +1,15 @@
 # %%
 import pandas as pd
-import geopandas as gpd
 import matplotlib.pyplot as plt
-import matplotlib.patheffects as pe
 from matplotlib.ticker import FuncFormatter
 import seaborn as sns
-import unicodedata
 import os
 
+from censo_instrumentacion import Reporte
+
+from censo_geometria import cargar_mapa, normalizar
+from censo_graficos import contorno, etiquetar_puntos, formatear, formatear_cantidad, puntos_etiqueta, unir
+
 # --- 1. CONFIGURACIÓN DE RUTAS ABSOLUTAS ---
 BASE_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage"
 # Ruta donde el Script 01 guarda los CSV
@@ -16,9 +18,13 @@ DATA_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO"
 IMG_DIR = os.path.join(BASE_DIR, "images", "CENSO2024")
 
 # --- 2. CARGA DE DATOS ---
+# Tiempos por sección -> reportes/corridas.ndjson
+reporte = Reporte("02_dashboard.py")
+reporte.tramo('carga')
 try:
     df_mapa_data = pd.read_csv(os.path.join(DATA_DIR, "resumen_deptos.csv"))
     df_edad_data = pd.read_csv(os.path.join(DATA_DIR, "resumen_edades.csv"))
+    reporte.filas_salida(len(df_mapa_data) + len(df_edad_data))
     
     # === EL TRUCO PARA LOS 6.03M ===
     # Calculamos el total ANTES de limpiar los datos incompletos
@@ -30,6 +36,7 @@ except FileNotFoundError as e:
     exit()
 
 # --- 3. LIMPIEZA PARA EL MAPA ---
+reporte.tramo('limpieza')
 # Eliminamos los registros sin departamento para que Matplotlib no falle
 df_mapa_data.dropna(subset=['Nombre_Depto'], inplace=True)
 df_mapa_data['Nombre_Depto'] = df_mapa_data['Nombre_Depto'].astype(str)
@@ -39,33 +46,28 @@ df_mapa_data['Pct_Mujeres'] = (df_mapa_data['Mujeres'] / df_mapa_data['Poblacion
 df_mapa_data['Pct_Hombres'] = (df_mapa_data['Hombres'] / df_mapa_data['Poblacion']) * 100
 
 # --- 4. GEOMETRÍA DEL MAPA ---
-print("🗺️ Descargando geometría...")
-url_mapa = "https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_SLV_1.json"
-gdf_mapa = gpd.read_file(url_mapa)
-
-def normalizar(texto):
-    if not isinstance(texto, str): return "SIN_DATO"
-    return unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8').upper().replace(" ", "").strip()
+reporte.tramo('geometria')
+# Caché local ya simplificada, con match_key y punto de etiqueta precalculados
+print("🗺️ Cargando geometría (caché local)...")
+gdf_mapa = cargar_mapa(nivel=1)
 
 df_mapa_data['match_key'] = df_mapa_data['Nombre_Depto'].apply(normalizar)
-gdf_mapa['match_key'] = gdf_mapa['NAME_1'].apply(normalizar)
 mapa_final = gdf_mapa.merge(df_mapa_data, on='match_key', how='left')
 
 # --- 5. VISUALIZACIÓN ---
+reporte.tramo('dibujo')
 fig = plt.figure(figsize=(20, 11))
 
 # === A) MAPA ===
 ax1 = fig.add_axes([0.02, 0.05, 0.65, 0.90]) 
 mapa_final.plot(column='Poblacion', cmap='OrRd', linewidth=0.6, ax=ax1, edgecolor='black', legend=False)
 
-for idx, row in mapa_final.iterrows():
-    centroid = row['geometry'].representative_point()
-    pob = row['Poblacion']
-    if pd.notna(pob):
-        txt_num = f"{pob/1e6:.1f}M" if pob >= 1e6 else f"{pob/1e3:.0f}K"
-        label_text = f"{row['Nombre_Depto']}\n{txt_num}\nH:{row['Pct_Hombres']:.0f}% M:{row['Pct_Mujeres']:.0f}%"
-        ax1.annotate(text=label_text, xy=(centroid.x, centroid.y), ha='center', fontsize=7, fontweight='bold',
-                     path_effects=[pe.withStroke(linewidth=1.5, foreground="white")])
+# Etiquetas por columna (sin iterrows): posiciones y textos de todos los deptos de una vez
+con_dato = mapa_final.dropna(subset=['Poblacion'])
+x, y = puntos_etiqueta(con_dato)
+textos = unir(con_dato['Nombre_Depto'].astype(str), "\n", formatear_cantidad(con_dato['Poblacion']),
+              "\nH:", formatear('%.0f', con_dato['Pct_Hombres']), "% M:", formatear('%.0f', con_dato['Pct_Mujeres']), "%")
+etiquetar_puntos(ax1, x, y, textos, ha='center', fontsize=7, fontweight='bold', path_effects=contorno(1.5))
 
 # USAMOS EL TOTAL OFICIAL (6.03M) AQUÍ
 ax1.text(x=0.05, y=0.05, transform=ax1.transAxes, s=f"POBLACIÓN TOTAL\n{total_pais_oficial/1e6:.2f} Millones",
@@ -94,11 +96,13 @@ ax3.set_title("DISTRIBUCIÓN POR EDAD", fontsize=12, fontweight='bold')
 plt.suptitle('DASHBOARD DEMOGRÁFICO: CENSO EL SALVADOR 2024', fontsize=22, fontweight='bold', y=0.96)
 
 # --- 6. GUARDADO ORGANIZADO ---
+reporte.tramo('guardado')
 if not os.path.exists(IMG_DIR):
     os.makedirs(IMG_DIR)
 
 save_path = os.path.join(IMG_DIR, "dashboard_poblacion.png")
 fig.savefig(save_path, dpi=300, bbox_inches='tight')
 print(f"✅ Dashboard guardado en:\n{save_path}")
+reporte.guardar()
 
 plt.show()
\ No newline at end of file
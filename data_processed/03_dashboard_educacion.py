@@ -1,10 +1,14 @@
 # %%
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import FuncFormatter
 import os
 
+from censo_instrumentacion import Reporte
+from censo_graficos import etiquetar_puntos, formatear, unir
+
 # --- 1. CONFIGURACIÓN DE RUTAS ABSOLUTAS ---
 BASE_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage"
 # Ruta donde el Script 01 guarda los CSV
@@ -13,12 +17,16 @@ DATA_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO"
 IMG_DIR = os.path.join(BASE_DIR, "images", "CENSO2024")
 
 # --- 2. CARGA DE DATOS ---
+# Tiempos por sección -> reportes/corridas.ndjson
+reporte = Reporte("03_dashboard_educacion.py")
+reporte.tramo('carga')
 try:
     path_edu = os.path.join(DATA_DIR, "resumen_educacion.csv")
     path_eng = os.path.join(DATA_DIR, "resumen_ingles.csv")
     
     df_edu = pd.read_csv(path_edu)
     df_eng = pd.read_csv(path_eng)
+    reporte.filas_salida(len(df_edu) + len(df_eng))
     
     # Capturamos totales nacionales ANTES de limpiar para no perder precisión
     pob_total_ingles = df_eng['Poblacion_4plus'].sum()
@@ -30,6 +38,7 @@ except FileNotFoundError as e:
     exit()
 
 # --- 3. LIMPIEZA ---
+reporte.tramo('limpieza')
 # Eliminamos registros sin departamento asignado ('Ignorado' o nulos)
 basura = ['DESCONOCIDO', 'Ignorado', 'nan']
 df_edu = df_edu.dropna(subset=['Nombre_Depto'])
@@ -42,6 +51,7 @@ df_edu['Nombre_Depto'] = df_edu['Nombre_Depto'].astype(str)
 df_eng['Nombre_Depto'] = df_eng['Nombre_Depto'].astype(str)
 
 # --- 4. PREPARACIÓN DE DATOS ---
+reporte.tramo('preparacion')
 df_pivot = df_edu.pivot(index='Nombre_Depto', columns='Nivel_Educativo', values='Conteo').fillna(0)
 
 orden_niveles = ['Ninguno', 'Inicial', 'Especial', 'Básica', 'Media', 'Superior', 'Ignorado']
@@ -58,6 +68,7 @@ df_pct = df_pct.sort_values(by=cols_sort, ascending=True)
 df_eng = df_eng.set_index('Nombre_Depto').reindex(df_pct.index).fillna(0)
 
 # --- 5. VISUALIZACIÓN ---
+reporte.tramo('dibujo')
 fig = plt.figure(figsize=(20, 11))
 
 colores_edu = {
@@ -77,9 +88,14 @@ ax1.set_xlabel("Distribución de la Población (%)", fontsize=11)
 ax1.set_ylabel("")
 ax1.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f'{x:.0f}%'))
 
-for c in ax1.containers:
-    labels = [f'{v.get_width():.1f}%' if v.get_width() > 4 else '' for v in c]
-    ax1.bar_label(c, labels=labels, label_type='center', fontsize=9, color='white', fontweight='bold')
+# Etiquetas de TODOS los segmentos de una vez: centro de cada segmento = acumulado - mitad
+# (las barras van en y = 0, 1, 2... en el orden de df_pct); los < 4% no llevan texto
+valores = df_pct.to_numpy()
+centros = valores.cumsum(axis=1) - valores / 2
+filas = np.broadcast_to(np.arange(len(df_pct))[:, None], valores.shape)
+textos = np.where(valores > 4, unir(formatear('%.1f', valores), '%'), '')
+etiquetar_puntos(ax1, centros.ravel(), filas.ravel(), textos.ravel(),
+                 ha='center', va='center', fontsize=9, color='white', fontweight='bold')
 
 ax1.legend(loc='upper center', bbox_to_anchor=(0.5, -0.12), ncol=4, frameon=False, fontsize=10)
 
@@ -101,11 +117,13 @@ if pob_total_ingles > 0:
 plt.suptitle('RADIOGRAFÍA DE CAPITAL HUMANO: EL SALVADOR 2024', fontsize=22, fontweight='bold', y=0.97)
 
 # --- 6. GUARDADO ORGANIZADO ---
+reporte.tramo('guardado')
 if not os.path.exists(IMG_DIR):
     os.makedirs(IMG_DIR)
 
 save_path = os.path.join(IMG_DIR, "dashboard_educacion.png")
 fig.savefig(save_path, dpi=300, bbox_inches='tight')
 print(f"✅ Dashboard de Educación guardado en:\n{save_path}")
+reporte.guardar()
 
 plt.show()
\ No newline at end of file
@@ -4,6 +4,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 
+from censo_instrumentacion import Reporte
+from censo_graficos import etiquetar_puntos, formatear
+
 # --- 1. CONFIGURACIÓN DE RUTAS ABSOLUTAS ---
 WEB_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage"
 # Ruta donde el Script 01 guarda los CSV
@@ -12,9 +15,13 @@ DATA_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO"
 IMG_DIR = os.path.join(WEB_DIR, "images", "CENSO2024")
 
 # --- 2. CARGA Y LIMPIEZA ---
+# Tiempos por sección -> reportes/corridas.ndjson
+reporte = Reporte("04_dashboard_digital.py")
+reporte.tramo('carga')
 try:
     path_tic = os.path.join(DATA_DIR, "resumen_tic_completo.csv")
     df_tic = pd.read_csv(path_tic)
+    reporte.filas_salida(len(df_tic))
     
     # === DETECCIÓN AUTOMÁTICA DE COLUMNA DE POBLACIÓN ===
     # Buscamos nombres comunes para evitar el KeyError
@@ -38,6 +45,7 @@ df_tic = df_tic[~df_tic['Nombre_Depto'].isin(['DESCONOCIDO', 'Ignorado', 'nan'])
 df_tic = df_tic.sort_values('Pct_Internet', ascending=True)
 
 # --- 3. PREPARACIÓN PARA SEABORN ---
+reporte.tramo('preparacion')
 cols_mostrar = ['Pct_Internet', 'Pct_Smartphone', 'Pct_Laptop', 'Pct_PC_Escritorio', 'Pct_Tablet']
 df_plot = df_tic.melt(id_vars='Nombre_Depto', value_vars=cols_mostrar, 
                       var_name='Dispositivo', value_name='Porcentaje')
@@ -46,6 +54,7 @@ df_plot = df_tic.melt(id_vars='Nombre_Depto', value_vars=cols_mostrar,
 df_plot['Dispositivo'] = df_plot['Dispositivo'].str.replace('Pct_', '').str.replace('_', ' ')
 
 # --- 4. VISUALIZACIÓN ---
+reporte.tramo('dibujo')
 fig, ax = plt.subplots(figsize=(12, 8))
 sns.set_style("whitegrid")
 
@@ -60,12 +69,12 @@ ax.hlines(y=df_tic['Nombre_Depto'], xmin=0, xmax=100, color='gray', alpha=0.1, l
 sns.scatterplot(data=df_plot, x='Porcentaje', y='Nombre_Depto', hue='Dispositivo', 
                 palette=palette, s=120, zorder=3, edgecolor='black', alpha=0.8, ax=ax)
 
-# Etiquetas de datos simplificadas (Smartphone y Laptop)
-for i, (idx, row) in enumerate(df_tic.iterrows()):
-    ax.text(row['Pct_Smartphone'] + 1.5, i, f"{row['Pct_Smartphone']:.0f}%", 
-            va='center', fontsize=8, color='#27ae60', fontweight='bold')
-    ax.text(row['Pct_Laptop'] - 1.5, i, f"{row['Pct_Laptop']:.0f}%", 
-            va='center', ha='right', fontsize=8, color='#c0392b', fontweight='bold')
+# Etiquetas de datos simplificadas (Smartphone y Laptop), por columna: fila i -> y = i
+filas = range(len(df_tic))
+etiquetar_puntos(ax, df_tic['Pct_Smartphone'] + 1.5, filas, formatear('%.0f%%', df_tic['Pct_Smartphone']),
+                 va='center', fontsize=8, color='#27ae60', fontweight='bold')
+etiquetar_puntos(ax, df_tic['Pct_Laptop'] - 1.5, filas, formatear('%.0f%%', df_tic['Pct_Laptop']),
+                 va='center', ha='right', fontsize=8, color='#c0392b', fontweight='bold')
 
 # Formato final
 plt.title("ADOPCIÓN TECNOLÓGICA: EL SALVADOR 2024", fontsize=15, fontweight='bold', pad=15)
@@ -83,11 +92,13 @@ plt.figtext(0.5, 0.92, "Comparación del uso de dispositivos digitales por depar
 plt.tight_layout()
 
 # --- 5. GUARDADO ORGANIZADO ---
+reporte.tramo('guardado')
 if not os.path.exists(IMG_DIR):
     os.makedirs(IMG_DIR)
 
 save_path = os.path.join(IMG_DIR, "dashboard_digital.png")
 fig.savefig(save_path, dpi=300, bbox_inches='tight')
 print(f"✅ Dashboard Digital guardado en:\n{save_path}")
+reporte.guardar()
 
 plt.show()
\ No newline at end of file
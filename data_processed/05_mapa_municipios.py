@@ -0,0 +1,94 @@
+# %%
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import os
+
+from censo_instrumentacion import Reporte
+
+from censo_geometria import cargar_mapa, normalizar, tabla_municipios, ARCHIVO_MUNICIPIOS
+from censo_graficos import PlantillaMapa, contorno, formatear, puntos_etiqueta, unir
+
+# --- 1. CONFIGURACIÓN DE RUTAS ABSOLUTAS ---
+BASE_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage"
+# Ruta donde el Script 01 guarda los CSV
+DATA_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO"
+IMG_DIR = os.path.join(BASE_DIR, "images", "CENSO2024")
+
+# Variables del mapa -> título. La primera es mapa_municipios.png; las demás salen como
+# mapa_municipios_<variable>.png sobre la MISMA figura (ver censo_graficos.PlantillaMapa).
+# Si cambian, actualizar también VARIANTES_MAPA en censo_pipeline.py
+VARIABLES = {
+    'Pct_Internet': "% CON INTERNET (10+ AÑOS)",
+    'Pct_Smartphone': "% CON SMARTPHONE (10+ AÑOS)",
+    'Pct_Ingles': "% QUE HABLA INGLÉS (4+ AÑOS)",
+}
+# Cuántos municipios llevan etiqueta (los más poblados)
+MAX_ETIQUETAS = 25
+
+# --- 2. CARGA DE DATOS ---
+# Tiempos por sección -> reportes/corridas.ndjson
+reporte = Reporte("05_mapa_municipios.py")
+reporte.tramo('carga')
+try:
+    df_muni = pd.read_csv(os.path.join(DATA_DIR, "resumen_municipios.csv"))
+    reporte.filas_salida(len(df_muni))
+    print(f"✅ Datos cargados: {len(df_muni)} municipios.")
+except FileNotFoundError as e:
+    print(f"❌ ERROR: falta un archivo ({e}).")
+    print("resumen_municipios.csv lo crea 01_procesar_datos.py si el CSV trae el código de municipio.")
+    exit()
+
+# --- 3. GEOMETRÍA + UNIÓN (sin iterrows: todo por columnas) ---
+reporte.tramo('geometria')
+# Código del censo -> nombre del municipio (se genera desde GADM la primera vez)
+df_nombres = tabla_municipios()
+df_muni = df_muni.dropna(subset=['Nombre_Depto', 'MUNIC']).merge(df_nombres, on=['DEPTO', 'MUNIC'], how='left')
+df_muni['match_key_depto'] = df_muni['Nombre_Depto'].map(normalizar)
+df_muni['match_key'] = df_muni['Nombre_Municipio'].map(normalizar)
+
+print("🗺️ Cargando geometría de municipios (caché local)...")
+gdf_muni = cargar_mapa(nivel=2)
+# Bordes de los deptos encima, para ubicarse
+gdf_deptos = cargar_mapa(nivel=1)
+mapa_final = gdf_muni.merge(df_muni, on=['match_key_depto', 'match_key'], how='left')
+
+sin_unir = mapa_final['Poblacion'].isna().sum()
+if sin_unir:
+    print(f"⚠️ {sin_unir} municipios del mapa sin datos (revisa {os.path.basename(ARCHIVO_MUNICIPIOS)})")
+
+# --- 4. VISUALIZACIÓN ---
+reporte.tramo('dibujo')
+plantilla = PlantillaMapa(mapa_final, figsize=(20, 11))
+gdf_deptos.boundary.plot(ax=plantilla.ax, linewidth=0.8, color='black')
+plantilla.ax.axis('off')
+plt.suptitle('MAPA MUNICIPAL: CENSO EL SALVADOR 2024', fontsize=22, fontweight='bold', y=0.96)
+fig = plantilla.fig
+
+# Solo los municipios más poblados llevan etiqueta (cientos de textos no se leen a 300 dpi)
+etiquetas = mapa_final.nlargest(MAX_ETIQUETAS, 'Poblacion')
+x, y = puntos_etiqueta(etiquetas)
+
+# --- 5. GUARDADO ORGANIZADO ---
+if not os.path.exists(IMG_DIR):
+    os.makedirs(IMG_DIR)
+
+# La variable principal va al final: la figura queda con ella (censo_render la reusa)
+principal = next(iter(VARIABLES))
+for variable in list(VARIABLES)[1:] + [principal]:
+    reporte.tramo('dibujo')
+    titulo = VARIABLES[variable]
+    plantilla.pintar(mapa_final[variable], cmap='YlGnBu', titulo_barra=titulo)
+    textos = unir(etiquetas['NAME_2'].astype(str), "\n", formatear('%.0f%%', etiquetas[variable]))
+    textos = np.where(etiquetas[variable].notna(), textos, '')
+    plantilla.etiquetar(x, y, textos, ha='center', fontsize=6, fontweight='bold', path_effects=contorno(1.2))
+    plantilla.ax.set_title(f"{titulo} POR MUNICIPIO", fontsize=14, fontweight='bold')
+
+    reporte.tramo('guardado')
+    nombre = "mapa_municipios.png" if variable == principal else f"mapa_municipios_{variable.lower()}.png"
+    save_path = os.path.join(IMG_DIR, nombre)
+    fig.savefig(save_path, dpi=300, bbox_inches='tight')
+    print(f"✅ Mapa guardado en:\n{save_path}")
+reporte.guardar()
+
+plt.show()
@@ -0,0 +1,125 @@
+# %%
+import argparse
+import os
+import runpy
+import sys
+
+# ==========================================
+# --- CLI ÚNICA DEL CENSO (ARRANQUE INSTANTÁNEO) ---
+# ==========================================
+# Un solo punto de entrada para todo el flujo. Aquí arriba solo hay imports de la
+# librería estándar: pandas, geopandas, matplotlib y seaborn se importan DENTRO de cada
+# subcomando y solo si hacen falta. Así "--help" o "estado" responden al instante.
+#
+# Uso:  python censo.py procesar [--workers N --cubo ...]   (01_procesar_datos.py)
+#       python censo.py estado                              (qué etapas están desactualizadas)
+#       python censo.py pipeline [--forzar --solo ...]      (censo_pipeline.py)
+#       python censo.py dashboard [digital educacion ...]   (usa el worker si está corriendo)
+#       python censo.py servidor [--detener]                (worker en caliente)
+#       python censo.py web [--arrow]                       (JSON para projects.qmd)
+#       python censo.py rondas [--rondas 2007 2024]         (comparación entre censos)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Los scripts importan los módulos censo_* desde su carpeta
+sys.path.insert(0, SCRIPTS_DIR)
+
+# Nombres de los dashboards sin importar censo_render (se valida al renderizar)
+DASHBOARDS = ['poblacion', 'educacion', 'digital', 'municipios']
+
+
+def _script(nombre, argumentos):
+    # Corre un script tal cual (como "python script.py argumentos"); su argparse hace el resto
+    sys.argv = [nombre, *argumentos]
+    runpy.run_path(os.path.join(SCRIPTS_DIR, nombre), run_name='__main__')
+
+
+def cmd_procesar(args, resto):
+    _script('01_procesar_datos.py', resto)
+
+
+def cmd_pipeline(args, resto):
+    _script('censo_pipeline.py', resto)
+
+
+def cmd_estado(args, resto):
+    from censo_pipeline import correr_pipeline
+    correr_pipeline(revisar=True)
+
+
+def cmd_dashboard(args, resto):
+    from censo_render import pedir_al_worker
+
+    nombres = args.dashboards or DASHBOARDS
+    if not args.sin_worker:
+        resultados = [pedir_al_worker(n, args.formatos, args.miniaturas) for n in nombres]
+        if all(r is not None for r in resultados):
+            for nombre, generados, segundos, salida in resultados:
+                print(salida, end='')
+                estado = "✅" if generados else "❌"
+                print(f"{estado} {nombre} (worker): {segundos:.2f}s -> "
+                      f"{', '.join(os.path.basename(g) for g in generados)}")
+            return
+        print("ℹ️ No hay worker corriendo ('censo.py servidor'); renderizando aquí.")
+    from censo_render import renderizar_todos
+    renderizar_todos(nombres, args.formatos, args.miniaturas)
+
+
+def cmd_servidor(args, resto):
+    from censo_render import pedir_al_worker, servir
+    if args.detener:
+        detenido = pedir_al_worker(None) is not None
+        print("👋 Worker detenido." if detenido else "ℹ️ No había worker corriendo.")
+        return
+    servir()
+
+
+def cmd_web(args, resto):
+    _script('censo_web.py', resto)
+
+
+def cmd_rondas(args, resto):
+    _script('censo_rondas.py', resto)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="censo", description="Procesamiento y dashboards del CENSO 2024")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    # Estos pasan sus argumentos al script, que tiene su propio --help
+    for nombre, funcion, ayuda in [
+        ('procesar', cmd_procesar, "Lee el censo y genera los resumen_*.csv (01_procesar_datos.py)"),
+        ('pipeline', cmd_pipeline, "Corre solo las etapas desactualizadas (censo_pipeline.py)"),
+        ('web', cmd_web, "Exporta los JSON de los gráficos interactivos (censo_web.py)"),
+        ('rondas', cmd_rondas, "Compara censos (2007, 2024...) desde agregados en caché (censo_rondas.py)"),
+    ]:
+        p = sub.add_parser(nombre, help=ayuda, add_help=False)
+        p.set_defaults(funcion=funcion)
+
+    p = sub.add_parser('estado', help="Muestra qué etapas del pipeline están desactualizadas (no corre nada)")
+    p.set_defaults(funcion=cmd_estado)
+
+    p = sub.add_parser('dashboard', help="Renderiza dashboards (en el worker en caliente si está corriendo)")
+    # Sin choices: con nargs="*" argparse valida la lista vacía por defecto y falla (se valida en main)
+    p.add_argument("dashboards", nargs="*", help=f"{', '.join(DASHBOARDS)} (por defecto, todos)")
+    p.add_argument("--formatos", nargs="*", default=[], choices=['webp', 'avif'])
+    p.add_argument("--miniaturas", action="store_true")
+    p.add_argument("--sin-worker", action="store_true", help="Renderiza en procesos nuevos aunque haya worker")
+    p.set_defaults(funcion=cmd_dashboard)
+
+    p = sub.add_parser('servidor', help="Worker que mantiene librerías y resúmenes cargados")
+    p.add_argument("--detener", action="store_true", help="Detiene el worker que esté corriendo")
+    p.set_defaults(funcion=cmd_servidor)
+    return parser
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args, resto = parser.parse_known_args(argv)
+    desconocidos = [n for n in getattr(args, 'dashboards', []) if n not in DASHBOARDS]
+    if desconocidos:
+        parser.error(f"dashboard desconocido: {', '.join(desconocidos)} (opciones: {', '.join(DASHBOARDS)})")
+    args.funcion(args, resto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# %%
+import itertools
+
+import pandas as pd
+
+from censo_carga import acumular, es_si
+from censo_diccionario import codigos_deptos, etiquetar  # noqa: F401 (codigos_deptos se importa desde aquí)
+from censo_instrumentacion import SIN_REPORTE
+from censo_recodificacion import recodificar, NIVEL_EDUCATIVO
+
+# ==========================================
+# --- MOTOR DE AGREGACIÓN EN UNA SOLA PASADA ---
+# ==========================================
+# Antes cada módulo (Demografía, Educación, TIC) recorría todo el censo por su
+# cuenta, con copias completas (.copy()) y pd.to_numeric repetido sobre la edad.
+# Ahora cada bloque se reduce UNA vez a una tabla base de conteos agrupada por
+# claves compartidas (Depto x Edad x Grado). Todos los resumen_*.csv salen de
+# esa tabla base, que tiene pocos miles de filas sin importar el tamaño del censo.
+
+# Claves compartidas: con la edad en la clave, los filtros ">= 4 años" y ">= 10 años"
+# se aplican DESPUÉS de agregar y el resultado es exacto.
+CLAVES_BASE = ['DEPTO', 'P02_3_EDAD', 'P10_1_GRADO_APROBADO']
+
+# Variables TIC (1=Sí, resto=0) -> nombre de columna en el resumen
+variables_tic = {
+    'P14_6_USO_TIC_INTERNET': 'Internet',
+    'P14_4_USO_TIC_SMARTPHONE': 'Smartphone',
+    'P14_2_USO_TIC_LAPTOP': 'Laptop',
+    'P14_1_USO_TIC_PC': 'PC_Escritorio',
+    'P14_3_USO_TIC_TABLET': 'Tablet',
+    'P14_5_USO_TIC_CEL': 'Cel_Basico',
+}
+
+
+# --- MÉTRICAS POR FILA ---
+# Cada métrica es un vector 0/1 por persona que se SUMA dentro de cada grupo.
+# Agregar un módulo nuevo = agregar métricas aquí + un resumen abajo (sin pasada extra).
+def _metricas(df):
+    persona = df['COD_PER'].notna()
+    sexo = df['P02_2_SEXO']
+    metricas = {
+        'Registros': pd.Series(1, index=df.index, dtype='int32'),
+        'Personas': persona,
+        'Mujeres': persona & sexo.eq(2).fillna(False),
+        'Hombres': persona & sexo.eq(1).fillna(False),
+        'Ingles': es_si(df['P12_3_A_ENG']),
+    }
+    for col_censo, nombre in variables_tic.items():
+        metricas[nombre] = es_si(df[col_censo])
+    return metricas
+
+
+def agregar_bloque(df):
+    # Una sola agrupación por bloque; dropna=False para no perder edades/deptos vacíos
+    base = pd.DataFrame({c: df[c] for c in CLAVES_BASE})
+    for nombre, valores in _metricas(df).items():
+        base[nombre] = valores
+    return base.groupby(CLAVES_BASE, dropna=False).sum()
+
+
+def agregar(bloques, al_avanzar=None, reporte=SIN_REPORTE):
+    # Recorre los bloques una vez y va sumando las tablas base parciales.
+    # Con un Reporte se mide por separado la lectura ('carga') y la 'agregacion'.
+    base = None
+    total = 0
+    bloques = iter(bloques)
+    for i in itertools.count(1):
+        with reporte.etapa('carga') as e:
+            bloque = next(bloques, None)
+            e['filas_salida'] = 0 if bloque is None else len(bloque)
+        if bloque is None:
+            break
+        with reporte.etapa('agregacion', filas_entrada=len(bloque)) as e:
+            base = acumular(base, agregar_bloque(bloque))
+            e['filas_salida'] = len(base)
+        total += len(bloque)
+        if al_avanzar:
+            al_avanzar(i, total)
+    return base, total
+
+
+# ==========================================
+# --- RESÚMENES (PROYECCIONES DE LA TABLA BASE) ---
+# ==========================================
+def _con_depto(base):
+    # Registros con departamento asignado (el groupby('DEPTO') de siempre los descarta)
+    tabla = base.reset_index()
+    return tabla[tabla['DEPTO'].notna()]
+
+
+def resumen_deptos(base):
+    tabla = _con_depto(base).groupby('DEPTO')[['Personas', 'Mujeres', 'Hombres']].sum()
+    df_deptos = tabla.rename(columns={'Personas': 'Poblacion'}).reset_index()
+    df_deptos['Nombre_Depto'] = etiquetar(df_deptos['DEPTO'], 'DEPTO')
+    return df_deptos
+
+
+def resumen_edades(base):
+    # Cuánta gente tiene cada edad (0 años: 50k, 1 año: 48k...)
+    tabla = base.reset_index()
+    df_edades = tabla.groupby('P02_3_EDAD')['Registros'].sum().reset_index()
+    df_edades.columns = ['Edad', 'Frecuencia']
+    return df_edades.sort_values('Edad')
+
+
+def resumen_educacion(base):
+    # IMPORTANTE: solo >= 4 años para no inflar "Ninguno"
+    tabla = _con_depto(base)
+    tabla = tabla[(tabla['P02_3_EDAD'] >= 4).fillna(False)]
+    # Se clasifica cada CÓDIGO de grado (unas decenas), no cada persona, con la tabla de rangos
+    nivel = pd.Series(recodificar(tabla['P10_1_GRADO_APROBADO'], NIVEL_EDUCATIVO),
+                      index=tabla.index, name='Nivel_Educativo')
+    resumen = tabla.groupby(['DEPTO', nivel])['Registros'].sum()
+    resumen = resumen.reset_index(name='Conteo')
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen
+
+
+def resumen_ingles(base):
+    tabla = _con_depto(base)
+    tabla = tabla[(tabla['P02_3_EDAD'] >= 4).fillna(False)]
+    resumen = tabla.groupby('DEPTO')[['Personas', 'Ingles']].sum().reset_index()
+    resumen.columns = ['DEPTO', 'Poblacion_4plus', 'Hablantes_Ingles']
+    resumen['Pct_Ingles'] = (resumen['Hablantes_Ingles'] / resumen['Poblacion_4plus']) * 100
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen
+
+
+def resumen_tic(base):
+    # Población > 10 años
+    tabla = _con_depto(base)
+    tabla = tabla[(tabla['P02_3_EDAD'] >= 10).fillna(False)]
+    cols_tic = list(variables_tic.values())
+    resumen = tabla.groupby('DEPTO')[['Personas'] + cols_tic].sum().reset_index()
+    resumen = resumen.rename(columns={'Personas': 'Total_Pob'})
+    for col in cols_tic:
+        resumen[f'Pct_{col}'] = (resumen[col] / resumen['Total_Pob']) * 100
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen
+
+
+# Nombre de archivo -> (función, encoding). Deptos y edades van sin BOM como siempre.
+RESUMENES = {
+    'resumen_deptos.csv': (resumen_deptos, None),
+    'resumen_edades.csv': (resumen_edades, None),
+    'resumen_educacion.csv': (resumen_educacion, 'utf-8-sig'),
+    'resumen_ingles.csv': (resumen_ingles, 'utf-8-sig'),
+    'resumen_tic_completo.csv': (resumen_tic, 'utf-8-sig'),
+}
+
+
+def construir_resumenes(base, reporte=SIN_REPORTE):
+    resumenes = {}
+    for archivo, (funcion, _) in RESUMENES.items():
+        with reporte.etapa(archivo.replace('.csv', ''), filas_entrada=len(base)) as e:
+            resumenes[archivo] = funcion(base)
+            e['filas_salida'] = len(resumenes[archivo])
+    return resumenes
+
+
+def guardar_resumenes(resumenes, output_folder, reporte=SIN_REPORTE):
+    # Resúmenes que no están en RESUMENES (ej. resumen_municipios.csv) van en utf-8-sig
+    with reporte.etapa('exportar', filas_entrada=sum(len(t) for t in resumenes.values())):
+        for archivo, tabla in resumenes.items():
+            encoding = RESUMENES.get(archivo, (None, 'utf-8-sig'))[1]
+            tabla.to_csv(f"{output_folder}/{archivo}", index=False, encoding=encoding)
@@ -0,0 +1,289 @@
+# %%
+import argparse
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from censo_carga import leer_censo_por_bloques, acumular
+from censo_agregados import (agregar, agregar_bloque, construir_resumenes, resumen_deptos, resumen_edades,
+                             resumen_educacion, resumen_ingles, resumen_tic, guardar_resumenes, variables_tic)
+from censo_paralelo import agregar_en_paralelo
+
+# ==========================================
+# --- BENCHMARK + REGRESIÓN CON MICRODATOS SINTÉTICOS ---
+# ==========================================
+# El CSV real vive en el Z: (y no se puede compartir), así que generamos un censo
+# SINTÉTICO con la misma forma (mismas columnas y distribuciones de códigos parecidas,
+# tomadas de los resumen_*.csv reales) a la escala que queramos.
+# Para cada escala se mide el tiempo de cada etapa y la RAM máxima (cada escala corre
+# en su propio proceso para que el pico de RAM no se mezcle), y se comparan los
+# resumen_*.csv contra los "golden" guardados para detectar cambios en los resultados.
+#
+# Uso:  python censo_benchmark.py                         (100k y 1M)
+#       python censo_benchmark.py --escalas 100k 1M 6M 20M
+#       python censo_benchmark.py --escalas 100k --guardar-golden
+# Además, con un censo sintético "sucio" (celdas como las del CSV real) se revisa que el
+# modo paralelo dé exactamente los mismos resúmenes que la lectura en serie.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(SCRIPTS_DIR, "benchmark")
+DATOS_DIR = os.path.join(BENCH_DIR, "datos")          # CSV sintéticos (no se suben al repo)
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")        # Resultados de referencia (sí se suben)
+ARCHIVO_RESULTADOS = os.path.join(BENCH_DIR, "resultados.ndjson")
+CENSO_DIR = os.path.join(SCRIPTS_DIR, "CENSO")
+
+ESCALAS = {'100k': 100_000, '1M': 1_000_000, '6M': 6_000_000, '20M': 20_000_000}
+SEMILLA = 2024
+FILAS_POR_ESCRITURA = 1_000_000
+
+# Columnas que el censo real trae pero no usamos (para que "usecols" tenga qué descartar)
+COLUMNAS_RELLENO = 20
+
+# Distribución aproximada de P10_1_GRADO_APROBADO (código -> proporción)
+DIST_GRADO = {0: 0.15, 1: 0.02, 2: 0.02, 3: 0.02, 4: 0.003, 9: 0.003, 10: 0.004,
+              11: 0.05, 12: 0.05, 13: 0.05, 14: 0.05, 15: 0.05, 16: 0.05, 17: 0.05, 18: 0.05, 19: 0.05,
+              21: 0.09, 22: 0.09, 23: 0.03, 24: 0.01, 30: 0.02, 31: 0.01, 40: 0.06, 41: 0.02,
+              50: 0.006, 60: 0.001, 99: 0.014}
+
+# Proporción de "Sí" (código 1) en cada TIC, para >= 10 años
+PROB_TIC = {'P14_1_USO_TIC_PC': 0.12, 'P14_2_USO_TIC_LAPTOP': 0.25, 'P14_3_USO_TIC_TABLET': 0.12,
+            'P14_4_USO_TIC_SMARTPHONE': 0.80, 'P14_5_USO_TIC_CEL': 0.12, 'P14_6_USO_TIC_INTERNET': 0.79}
+PROB_INGLES = 0.07
+
+# Celdas sucias que se siembran en el censo "sucio": texto, decimales, negativos y
+# códigos que no caben en el tipo compacto (ver censo_carga._ajustar_al_tipo)
+CELDAS_SUCIAS = {
+    'DEPTO': ['1.5'],
+    'P02_3_EDAD': ['X', '4.5', '70000'],
+    'P10_1_GRADO_APROBADO': ['3.5', '300', '-1', 'N/A'],
+    'P14_4_USO_TIC_SMARTPHONE': ['Si', '1.0'],
+}
+FILAS_SUCIAS = 3       # Filas al azar por cada valor sucio
+
+
+def _distribuciones():
+    # Departamentos, sexo y edades con las proporciones de los resúmenes reales del repo
+    deptos = pd.read_csv(os.path.join(CENSO_DIR, "resumen_deptos.csv"))
+    edades = pd.read_csv(os.path.join(CENSO_DIR, "resumen_edades.csv"))
+    return {
+        'deptos': (deptos['DEPTO'].to_numpy(), (deptos['Poblacion'] / deptos['Poblacion'].sum()).to_numpy()),
+        'edades': (edades['Edad'].to_numpy(), (edades['Frecuencia'] / edades['Frecuencia'].sum()).to_numpy()),
+        'p_mujer': deptos['Mujeres'].sum() / deptos['Poblacion'].sum(),
+    }
+
+
+def _bloque_sintetico(rng, n, dist):
+    codigos_depto, p_depto = dist['deptos']
+    codigos_edad, p_edad = dist['edades']
+    edad = rng.choice(codigos_edad, n, p=p_edad)
+
+    def si_no(p, desde_edad):
+        # 1=Sí, 2=No; vacío si la pregunta no aplica por la edad
+        valores = pd.array(np.where(rng.random(n) < p, 1, 2), dtype='Int8')
+        valores[edad < desde_edad] = pd.NA
+        return valores
+
+    grado = pd.array(rng.choice(list(DIST_GRADO), n, p=np.array(list(DIST_GRADO.values())) / sum(DIST_GRADO.values())),
+                     dtype='Int8')
+    grado[edad < 4] = pd.NA
+    df = pd.DataFrame({
+        'DEPTO': rng.choice(codigos_depto, n, p=p_depto),
+        'COD_PER': np.minimum(rng.geometric(0.3, n), 20),
+        'P02_2_SEXO': np.where(rng.random(n) < dist['p_mujer'], 2, 1),
+        'P02_3_EDAD': edad,
+        'P10_1_GRADO_APROBADO': grado,
+        'P12_3_A_ENG': si_no(PROB_INGLES, 4),
+    })
+    for col in variables_tic:
+        df[col] = si_no(PROB_TIC[col], 10)
+    for i in range(COLUMNAS_RELLENO):
+        df[f'RELLENO_{i:02d}'] = rng.integers(0, 100, n, dtype='int16')
+    return df
+
+
+def generar_censo_sintetico(filas, semilla=SEMILLA, destino=None):
+    # Escribe por partes (nunca tiene las 20M filas en memoria); reutiliza si ya existe
+    destino = destino or os.path.join(DATOS_DIR, f"censo_sintetico_{filas}_{semilla}.csv")
+    if os.path.exists(destino):
+        return destino
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    rng = np.random.default_rng(semilla)
+    dist = _distribuciones()
+    temporal = destino + ".parcial"
+    # 'w' una sola vez: si una corrida anterior se cortó, su .parcial se sobrescribe (no se le agrega)
+    with open(temporal, 'w', newline='', encoding='utf-8') as f:
+        for inicio in range(0, filas, FILAS_POR_ESCRITURA):
+            n = min(FILAS_POR_ESCRITURA, filas - inicio)
+            _bloque_sintetico(rng, n, dist).to_csv(f, header=(inicio == 0), index=False)
+    os.replace(temporal, destino)
+    return destino
+
+
+def generar_censo_sucio(filas=ESCALAS['100k'], semilla=SEMILLA):
+    destino = os.path.join(DATOS_DIR, f"censo_sucio_{filas}_{semilla}.csv")
+    if os.path.exists(destino):
+        return destino
+    os.makedirs(DATOS_DIR, exist_ok=True)
+    rng = np.random.default_rng(semilla)
+    df = _bloque_sintetico(rng, filas, _distribuciones())
+    for columna, valores in CELDAS_SUCIAS.items():
+        df[columna] = df[columna].astype(object)
+        for valor in valores:
+            df.loc[rng.choice(filas, FILAS_SUCIAS, replace=False), columna] = valor
+    temporal = destino + ".parcial"
+    df.to_csv(temporal, index=False)
+    os.replace(temporal, destino)
+    return destino
+
+
+def comparar_serie_paralelo(workers=2, chunksize=2_000):
+    # Regresión: el modo paralelo sobre el CSV (rangos de bytes, sin Parquet) lee las celdas
+    # sucias igual que la lectura en serie -> mismos resumen_*.csv byte a byte.
+    # Bloques chicos para que el modo tolerante arranque a mitad de archivo y de cada rango.
+    file_path = generar_censo_sucio()
+    corridas = {
+        'serie': lambda: agregar(leer_censo_por_bloques(file_path, chunksize=chunksize)),
+        'paralelo': lambda: agregar_en_paralelo(file_path, workers=workers, chunksize=chunksize),
+    }
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, correr in corridas.items():
+            os.makedirs(os.path.join(carpeta, nombre))
+            base, _ = correr()
+            guardar_resumenes(construir_resumenes(base), os.path.join(carpeta, nombre))
+        return {f: filecmp.cmp(os.path.join(carpeta, 'serie', f), os.path.join(carpeta, 'paralelo', f),
+                               shallow=False)
+                for f in sorted(os.listdir(os.path.join(carpeta, 'serie')))}
+
+
+def pico_rss_mb():
+    # RAM máxima del proceso (resource en Linux/Mac; psutil en Windows)
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 1024 / 1024 if sys.platform == 'darwin' else pico / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+
+def medir_etapas(file_path, output_folder):
+    # Mismo flujo que 01_procesar_datos.py, pero cronometrando cada etapa
+    tiempos = {'carga': 0.0, 'agregacion': 0.0}
+    base, total = None, 0
+    bloques = iter(leer_censo_por_bloques(file_path))
+    while True:
+        t0 = time.perf_counter()
+        bloque = next(bloques, None)
+        tiempos['carga'] += time.perf_counter() - t0
+        if bloque is None:
+            break
+        t0 = time.perf_counter()
+        base = acumular(base, agregar_bloque(bloque))
+        tiempos['agregacion'] += time.perf_counter() - t0
+        total += len(bloque)
+
+    resumenes = {}
+    etapas = {
+        'demografia': {'resumen_deptos.csv': resumen_deptos, 'resumen_edades.csv': resumen_edades},
+        'educacion': {'resumen_educacion.csv': resumen_educacion, 'resumen_ingles.csv': resumen_ingles},
+        'tic': {'resumen_tic_completo.csv': resumen_tic},
+    }
+    for etapa, funciones in etapas.items():
+        t0 = time.perf_counter()
+        for archivo, funcion in funciones.items():
+            resumenes[archivo] = funcion(base)
+        tiempos[etapa] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    guardar_resumenes(resumenes, output_folder)
+    tiempos['exportar'] = time.perf_counter() - t0
+    return total, tiempos
+
+
+def comparar_golden(output_folder, escala):
+    # Devuelve {archivo: True/False}; vacío si todavía no hay golden para esta escala
+    carpeta = os.path.join(GOLDEN_DIR, escala)
+    if not os.path.isdir(carpeta):
+        return {}
+    return {f: filecmp.cmp(os.path.join(carpeta, f), os.path.join(output_folder, f), shallow=False)
+            for f in sorted(os.listdir(carpeta))}
+
+
+def correr_escala(escala, guardar_golden=False):
+    # Se ejecuta en un proceso hijo (ver main) para que el pico de RAM sea de esta escala
+    file_path = generar_censo_sintetico(ESCALAS[escala])
+    rss_inicial = pico_rss_mb()
+    with tempfile.TemporaryDirectory() as output_folder:
+        t0 = time.perf_counter()
+        total, tiempos = medir_etapas(file_path, output_folder)
+        tiempo_total = time.perf_counter() - t0
+        if guardar_golden:
+            carpeta = os.path.join(GOLDEN_DIR, escala)
+            os.makedirs(carpeta, exist_ok=True)
+            for f in os.listdir(output_folder):
+                os.replace(os.path.join(output_folder, f), os.path.join(carpeta, f))
+        golden = comparar_golden(output_folder, escala) if not guardar_golden else {}
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'escala': escala,
+        'filas': total,
+        'tiempos_s': {k: round(v, 4) for k, v in tiempos.items()},
+        'total_s': round(tiempo_total, 4),
+        'rss_inicial_mb': round(rss_inicial, 1),
+        'rss_pico_mb': round(pico_rss_mb(), 1),
+        'golden': golden,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark y regresión del pipeline del censo")
+    parser.add_argument("--escalas", nargs="+", default=['100k', '1M'], choices=list(ESCALAS))
+    parser.add_argument("--guardar-golden", action="store_true",
+                        help="Guarda los resultados actuales como referencia (golden)")
+    parser.add_argument("--_hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._hijo:
+        print(json.dumps(correr_escala(args.escalas[0], args.guardar_golden), ensure_ascii=False))
+        return
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    hay_diferencias = False
+    for escala in args.escalas:
+        print(f"⏳ Escala {escala} ({ESCALAS[escala]:,} filas)...")
+        comando = [sys.executable, os.path.abspath(__file__), "--_hijo", "--escalas", escala]
+        if args.guardar_golden:
+            comando.append("--guardar-golden")
+        salida = subprocess.run(comando, check=True, capture_output=True, text=True, encoding='utf-8').stdout
+        resultado = json.loads(salida.strip().splitlines()[-1])
+
+        with open(ARCHIVO_RESULTADOS, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+        etapas = "  ".join(f"{k}={v:.2f}s" for k, v in resultado['tiempos_s'].items())
+        print(f"   ⏱️ {resultado['total_s']:.2f}s | RAM pico {resultado['rss_pico_mb']:.0f} MB | {etapas}")
+        if args.guardar_golden:
+            print(f"   💾 Golden guardado en {os.path.join(GOLDEN_DIR, escala)}")
+        elif not resultado['golden']:
+            print("   ⚠️ Sin golden para esta escala (usa --guardar-golden)")
+        else:
+            distintos = [f for f, igual in resultado['golden'].items() if not igual]
+            hay_diferencias |= bool(distintos)
+            print(f"   ❌ Difieren del golden: {', '.join(distintos)}" if distintos else "   ✅ Igual al golden")
+
+    print("⏳ Censo con celdas sucias: serie vs paralelo...")
+    distintos = [f for f, igual in comparar_serie_paralelo().items() if not igual]
+    hay_diferencias |= bool(distintos)
+    print(f"   ❌ El paralelo difiere en: {', '.join(distintos)}" if distintos else "   ✅ Paralelo igual a serie")
+    sys.exit(1 if hay_diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()
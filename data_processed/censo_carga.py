@@ -0,0 +1,473 @@
+# %%
+import bz2
+import gzip
+import io
+import json
+import os
+import shutil
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from censo_diccionario import DICCIONARIO, columnas_de
+
+# ==========================================
+# --- CARGA LIGERA DEL CENSO (POR BLOQUES) ---
+# ==========================================
+# El CSV maestro tiene ~6M de filas y muchísimas columnas, pero los módulos
+# solo usan una docena. Aquí declaramos cuáles leemos y con qué tipo, para
+# que pandas no infiera int64/object en todo y la RAM no se dispare.
+
+# Tipos compactos "nullable" (Int8/Int16/Int32) porque hay celdas vacías
+# (ej. las preguntas TIC solo aplican a mayores de 10 años).
+# Tipos, códigos válidos y etiquetas de cada variable: ver censo_diccionario.py
+DTYPES_CENSO = {columna: variable['tipo'] for columna, variable in DICCIONARIO.items()}
+# Columnas que no todas las versiones del CSV traen: solo se leen si se piden
+COLUMNAS_OPCIONALES = [c for c, variable in DICCIONARIO.items() if variable.get('opcional')]
+# (solo las de la base de población: las de vivienda las lee censo_vivienda.py)
+COLUMNAS_CENSO = [c for c in columnas_de('poblacion') if c not in COLUMNAS_OPCIONALES]
+
+# Filas por bloque: ~500k filas x 12 columnas compactas son pocas decenas de MB
+TAMANO_BLOQUE = 500_000
+
+
+# ==========================================
+# --- FUENTES EN STREAMING (RUTA, ARCHIVO ABIERTO O COMPRIMIDO) ---
+# ==========================================
+# El CSV no tiene que estar descomprimido ni copiado en el disco local: se acepta
+# una ruta, o cualquier archivo binario ya abierto (sys.stdin.buffer, un montaje de
+# red, una respuesta HTTP...), comprimido o no. Se lee con un buffer de tamaño fijo
+# y pandas lo va parseando por bloques, así que la RAM no depende del tamaño del archivo.
+#   - CSV local sin comprimir: memory_map (mmap) en lugar de read() al buffer.
+#   - gzip / bz2 / zstd: se descomprime al vuelo (zstd necesita "zstandard").
+#   - zip: solo desde una ruta (el índice del zip está al FINAL del archivo).
+
+TAMANO_BUFFER = 8 * 1024 * 1024
+
+# Primeros bytes de cada formato (no se confía en la extensión)
+FIRMAS_COMPRESION = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+    b'PK\x03\x04': 'zip',
+}
+
+
+def es_ruta(origen):
+    return isinstance(origen, (str, os.PathLike))
+
+
+def _compresion(flujo):
+    # peek() no consume bytes: sirve también para flujos que no se pueden rebobinar
+    inicio = flujo.peek(4)[:4]
+    return next((tipo for firma, tipo in FIRMAS_COMPRESION.items() if inicio.startswith(firma)), None)
+
+
+def compresion_de(origen):
+    # Tipo de compresión de una ruta (None = texto plano)
+    with io.BufferedReader(open(origen, 'rb'), TAMANO_BUFFER) as f:
+        return _compresion(f)
+
+
+class _FlujoDescomprimido(io.BufferedReader):
+    # Buffer sobre el descompresor. Al cerrarlo se cierran también los archivos que se
+    # abrieron para leerlo: GzipFile/BZ2File no cierran el archivo que reciben, y pandas
+    # no cierra los archivos que le llegan ya abiertos (en Windows quedarían bloqueados).
+    def __init__(self, descomprimido, abiertos):
+        super().__init__(descomprimido, TAMANO_BUFFER)
+        self._abiertos = abiertos
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for archivo in reversed(self._abiertos):
+                archivo.close()
+
+
+def _descomprimir(flujo, tipo, origen, abiertos):
+    if tipo == 'gzip':
+        return gzip.GzipFile(fileobj=flujo)
+    if tipo == 'bz2':
+        return bz2.BZ2File(flujo)
+    if tipo == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Para leer .zst instala zstandard (pip install zstandard)") from None
+        return zstandard.ZstdDecompressor().stream_reader(flujo, read_size=TAMANO_BUFFER, closefd=False)
+    # zip: el primer .csv de adentro, descomprimido al vuelo
+    if not es_ruta(origen) and not flujo.seekable():
+        raise ValueError("Un .zip no se puede leer como flujo: pasa la ruta del archivo")
+    archivo = zipfile.ZipFile(flujo)
+    abiertos.append(archivo)
+    miembro = next(n for n in archivo.namelist() if n.lower().endswith('.csv'))
+    return archivo.open(miembro)
+
+
+def abrir_flujo(origen):
+    # Devuelve (fuente para pd.read_csv, usar_mmap). Rutas a CSV plano -> la misma ruta + mmap.
+    # Usar cerrar_flujo(fuente) al terminar: cierra lo que se abrió aquí, pero nunca el
+    # flujo que pasó quien llama (ej. sys.stdin.buffer).
+    abiertos = []
+    if es_ruta(origen):
+        tipo = compresion_de(origen)
+        if tipo is None:
+            return origen, True
+        flujo = io.BufferedReader(open(origen, 'rb'), TAMANO_BUFFER)
+        abiertos.append(flujo)
+    else:
+        flujo = origen if hasattr(origen, 'peek') else io.BufferedReader(origen, TAMANO_BUFFER)
+        tipo = _compresion(flujo)
+    if tipo is None:
+        return flujo, False
+    try:
+        return _FlujoDescomprimido(_descomprimir(flujo, tipo, origen, abiertos), abiertos), False
+    except BaseException:
+        for archivo in reversed(abiertos):
+            archivo.close()
+        raise
+
+
+def cerrar_flujo(fuente):
+    if isinstance(fuente, _FlujoDescomprimido):
+        fuente.close()
+
+
+class _TramoArchivo(io.RawIOBase):
+    # Archivo "recortado": solo deja leer los bytes [inicio, fin) del CSV original
+    # (el modo paralelo reparte así un CSV plano entre procesos, ver censo_paralelo.py)
+    def __init__(self, file_path, inicio, fin):
+        self._f = open(file_path, 'rb')
+        self._f.seek(inicio)
+        self._restante = fin - inicio
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._restante)
+        if n <= 0:
+            return 0
+        leidos = self._f.readinto(memoryview(buffer)[:n])
+        self._restante -= leidos
+        return leidos
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def _leer_csv(file_path, chunksize, tramo=None, saltar=0, **opciones):
+    # pd.read_csv por bloques que, al terminar (o si se deja a medias), cierra la fuente.
+    # tramo=(inicio, fin): solo esos bytes de un CSV plano (sin encabezado: se lee aparte).
+    # saltar: filas de datos que ya se leyeron (se descartan sin convertirlas)
+    if tramo:
+        fuente, usar_mmap = io.BufferedReader(_TramoArchivo(file_path, *tramo), TAMANO_BUFFER), False
+        opciones.update(header=None, names=leer_encabezado(file_path))
+    else:
+        fuente, usar_mmap = abrir_flujo(file_path)
+    if saltar:
+        # Función y no range(): pandas convertiría el range en un set de millones de números
+        primera = 0 if tramo else 1
+        opciones['skiprows'] = lambda fila: primera <= fila < primera + saltar
+    try:
+        with pd.read_csv(fuente, chunksize=chunksize, memory_map=usar_mmap, **opciones) as lector:
+            yield from lector
+    finally:
+        fuente.close() if tramo else cerrar_flujo(fuente)
+
+
+# Conteos por columna que la carga deja en bloque.attrs (los reporta el Validador de
+# censo_diccionario.py): celdas que no eran números y quedaron vacías, y números que se
+# ajustaron al tipo compacto (decimales truncados o valores saturados, ver _ajustar_al_tipo)
+CONTEOS_CARGA = ('no_numericos', 'ajustados')
+
+
+def _ajustar_al_tipo(numeros, tipo):
+    # Igual que el flujo original (pd.to_numeric y luego rangos con int(valor)): 3.5 se trunca
+    # a 3 y lo que no cabe en el tipo compacto se satura en su mínimo/máximo ("300" en Int8
+    # -> 127: sigue cayendo en "Superior", y el Validador lo marca fuera de los códigos válidos).
+    # Así el parser nunca "da la vuelta" en silencio (300 en Int8 sería 44). Devuelve (columna, ajustados)
+    rango = np.iinfo(pd.api.types.pandas_dtype(tipo).numpy_dtype)
+    if numeros.dtype == 'Int64' and not (numeros.lt(rango.min).any() or numeros.gt(rango.max).any()):
+        return numeros.astype(tipo), 0      # lo normal: enteros que ya caben
+    numeros = numeros.astype('float64')
+    ajustados = np.trunc(numeros).clip(rango.min, rango.max)
+    return ajustados.astype(tipo), int((numeros.notna() & (ajustados != numeros)).sum())
+
+
+def _a_tipos(bloque, dtypes):
+    # Modo normal: el parser ya leyó enteros (como Int64); se pasan al tipo compacto
+    ajustados = {}
+    for columna, tipo in dtypes.items():
+        bloque[columna], ajustados[columna] = _ajustar_al_tipo(bloque[columna], tipo)
+    bloque.attrs.update(no_numericos={c: 0 for c in dtypes}, ajustados=ajustados)
+    return bloque
+
+
+def _a_numeros(bloque, dtypes):
+    # Modo tolerante (como el pd.to_numeric(errors='coerce') original): lo que no es un
+    # número queda vacío; los números se ajustan al tipo igual que en el modo normal
+    no_numericos, ajustados = {}, {}
+    for columna, tipo in dtypes.items():
+        texto = bloque[columna]
+        numeros = pd.to_numeric(texto, errors='coerce')
+        no_numericos[columna] = int((texto.notna() & numeros.isna()).sum())
+        bloque[columna], ajustados[columna] = _ajustar_al_tipo(numeros, tipo)
+    bloque.attrs.update(no_numericos=no_numericos, ajustados=ajustados)
+    return bloque
+
+
+def _leer_tolerante(file_path, columnas, dtypes, chunksize, tramo=None, saltar=0):
+    # Las columnas se leen como texto y se convierten bloque a bloque (más lento)
+    bloques = _leer_csv(file_path, chunksize, tramo, saltar, usecols=columnas, dtype={c: object for c in dtypes})
+    for bloque in bloques:
+        yield _a_numeros(bloque, dtypes)
+
+
+def leer_censo_por_bloques(file_path, columnas=None, chunksize=TAMANO_BLOQUE, tramo=None, dtypes=None):
+    # Devuelve un iterador de DataFrames; nunca se tiene el archivo completo en memoria.
+    # file_path puede ser una ruta o un archivo binario abierto (ver abrir_flujo).
+    # tramo=(inicio, fin): solo ese rango de bytes de un CSV plano (modo paralelo); sale
+    # EXACTAMENTE lo mismo que esas filas en la lectura completa, con celdas sucias o no.
+    # dtypes: tipos de columnas que no están en el diccionario (ej. otra ronda censal)
+    columnas = columnas or COLUMNAS_CENSO
+    tipos = {**DTYPES_CENSO, **(dtypes or {})}
+    dtypes = {c: tipos[c] for c in columnas if c in tipos}
+    if not es_ruta(file_path):
+        # Un flujo no se puede volver a leer desde el bloque que falló: tolerante desde el inicio
+        yield from _leer_tolerante(file_path, columnas, dtypes, chunksize)
+        return
+    # Lo normal: el parser de pandas convierte directo a enteros (Int64, que no se desborda;
+    # luego se pasa al tipo compacto). Si una celda no es un entero (ej. "X" o "3.5"),
+    # se relee desde ese bloque en modo tolerante.
+    leidas = 0
+    try:
+        for bloque in _leer_csv(file_path, chunksize, tramo, usecols=columnas, dtype={c: 'Int64' for c in dtypes}):
+            bloque = _a_tipos(bloque, dtypes)
+            leidas += len(bloque)
+            yield bloque
+    except (ValueError, TypeError, OverflowError):
+        print(f"⚠️ Celdas que no son enteros después de la fila {leidas:,}: se leen como texto")
+        yield from _leer_tolerante(file_path, columnas, dtypes, chunksize, tramo, saltar=leidas)
+
+
+def leer_encabezado(origen):
+    # Nombres de columnas sin leer datos (de una ruta; en un flujo se consumiría la primera línea)
+    fuente, _ = abrir_flujo(origen)
+    try:
+        return pd.read_csv(fuente, nrows=0).columns.tolist()
+    finally:
+        cerrar_flujo(fuente)
+
+
+def columnas_del_censo(file_path, parquet_dir=None):
+    # Lista de columnas del CSV original (de la metadata del Parquet si existe: no toca el Z:)
+    metadata = leer_metadata_parquet(parquet_dir) if parquet_dir else None
+    if metadata:
+        return metadata['columnas_csv']
+    return leer_encabezado(file_path)
+
+
+def acumular(acumulado, parcial):
+    # Suma dos tablas parciales alineando por índice (los conteos se combinan exacto)
+    if acumulado is None:
+        return parcial
+    niveles = list(range(parcial.index.nlevels))
+    return pd.concat([acumulado, parcial]).groupby(level=niveles, dropna=False).sum()
+
+
+def es_si(columna):
+    # 1=Sí, cualquier otro valor (incluido vacío) = 0
+    return columna.eq(1).fillna(False).astype('int8')
+
+
+# ==========================================
+# --- ALMACÉN COLUMNAR (PARQUET POR DEPTO) ---
+# ==========================================
+# Parsear el CSV de texto es la mayor parte del tiempo de cada corrida.
+# Lo convertimos UNA vez a Parquet particionado por DEPTO (carpetas DEPTO=1/,
+# DEPTO=2/, ...). Después solo se leen las columnas y departamentos pedidos.
+
+# Archivo con el esquema y la lista completa de columnas del CSV original
+# (el "_" inicial hace que pyarrow lo ignore al leer el dataset)
+ARCHIVO_META = "_metadata_censo.json"
+
+TIPOS_ARROW = {'Int8': 'int8', 'Int16': 'int16', 'Int32': 'int32', 'Int64': 'int64'}
+
+
+def _esquema_arrow(columnas):
+    import pyarrow as pa
+    return pa.schema([(c, getattr(pa, TIPOS_ARROW[DTYPES_CENSO[c]])()) for c in columnas])
+
+
+def huella_archivo(file_path):
+    # Tamaño + fecha de modificación: suficiente para saber si el CSV cambió
+    info = os.stat(file_path)
+    return {'size': info.st_size, 'mtime': info.st_mtime}
+
+
+def leer_metadata_parquet(parquet_dir):
+    ruta = os.path.join(parquet_dir, ARCHIVO_META)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def convertir_a_parquet(file_path, parquet_dir, columnas=None, chunksize=TAMANO_BLOQUE):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    columnas = columnas or COLUMNAS_CENSO
+    if 'DEPTO' not in columnas:
+        columnas = ['DEPTO'] + list(columnas)
+    esquema = _esquema_arrow(columnas)
+
+    # Celdas vacías o ajustadas al convertir (ver CONTEOS_CARGA; se guardan en la metadata)
+    conteos = {nombre: {} for nombre in CONTEOS_CARGA}
+
+    def lotes():
+        for bloque in leer_censo_por_bloques(file_path, columnas, chunksize):
+            for nombre, por_columna in conteos.items():
+                for columna, n in bloque.attrs.get(nombre, {}).items():
+                    por_columna[columna] = por_columna.get(columna, 0) + n
+            yield pa.RecordBatch.from_pandas(bloque[columnas], schema=esquema, preserve_index=False)
+
+    # Se escribe en una carpeta temporal y luego reemplaza a la anterior COMPLETA: si el CSV
+    # nuevo ya no trae un depto, su carpeta DEPTO=N/ vieja no debe quedar
+    temporal = parquet_dir.rstrip('/\\') + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    try:
+        ds.write_dataset(
+            lotes(), temporal, schema=esquema, format='parquet',
+            partitioning=ds.partitioning(pa.schema([('DEPTO', pa.int8())]), flavor='hive'),
+        )
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    shutil.rmtree(parquet_dir, ignore_errors=True)
+    os.replace(temporal, parquet_dir)
+
+    # Guardamos el esquema y TODAS las columnas del CSV (para buscar variables sin abrirlo).
+    # La metadata va al final: si la conversión se corta, el Parquet no queda "vigente"
+    metadata = {
+        'origen': file_path,
+        'huella': huella_archivo(file_path),
+        'columnas_csv': leer_encabezado(file_path),
+        'columnas': list(columnas),
+        'dtypes': {c: DTYPES_CENSO[c] for c in columnas},
+        **conteos,
+    }
+    with open(os.path.join(parquet_dir, ARCHIVO_META), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return metadata
+
+
+def parquet_vigente(file_path, parquet_dir, columnas=None):
+    # El Parquet sirve si tiene las columnas pedidas y el CSV no cambió desde la conversión.
+    # Si el CSV no está accesible (ej. sin conexión al Z:), confiamos en el Parquet.
+    metadata = leer_metadata_parquet(parquet_dir)
+    if metadata is None:
+        return False
+    if not set(columnas or COLUMNAS_CENSO) <= set(metadata['columnas']):
+        return False
+    if os.path.exists(file_path):
+        return metadata['huella'] == huella_archivo(file_path)
+    return True
+
+
+def _dataset_parquet(parquet_dir):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.dataset(
+        parquet_dir, format='parquet',
+        partitioning=ds.partitioning(pa.schema([('DEPTO', pa.int8())]), flavor='hive'),
+    )
+
+
+def _a_pandas(lote):
+    # Lote de Arrow -> DataFrame con los mismos tipos compactos que el CSV
+    import pyarrow as pa
+    tipos = {getattr(pa, t)(): pd.api.types.pandas_dtype(d) for d, t in TIPOS_ARROW.items()}
+    return lote.to_pandas(types_mapper=tipos.get)
+
+
+def leer_parquet_por_bloques(parquet_dir, columnas=None, deptos=None, chunksize=TAMANO_BLOQUE):
+    # Lectura con "predicate pushdown": solo se abren las carpetas DEPTO pedidas
+    import pyarrow.dataset as ds
+
+    columnas = columnas or COLUMNAS_CENSO
+    dataset = _dataset_parquet(parquet_dir)
+    filtro = None
+    if deptos is not None:
+        # None en la lista = registros sin departamento (carpeta __HIVE_DEFAULT_PARTITION__)
+        validos = [d for d in deptos if d is not None]
+        filtro = ds.field('DEPTO').isin(validos)
+        if len(validos) < len(deptos):
+            filtro = filtro | ds.field('DEPTO').is_null()
+    # Los conteos de la conversión (CONTEOS_CARGA) viajan en el primer bloque (para el
+    # Validador); con filtro de deptos no se sabe a cuáles tocan y se omiten
+    metadata = (leer_metadata_parquet(parquet_dir) or {}) if deptos is None else {}
+    conteos = {nombre: metadata.get(nombre, {}) for nombre in CONTEOS_CARGA}
+    for lote in dataset.to_batches(columns=list(columnas), filter=filtro, batch_size=chunksize):
+        if lote.num_rows:
+            bloque = _a_pandas(lote)
+            bloque.attrs.update({nombre: {c: n for c, n in por_columna.items() if c in bloque.columns}
+                                 for nombre, por_columna in conteos.items()})
+            conteos = {}
+            yield bloque
+
+
+def grupos_de_filas(parquet_dir):
+    # [(archivo, id del row group, filas)] de todo el dataset: la unidad más chica que se
+    # puede leer por separado (cada bloque escrito en la conversión es un row group)
+    return [(fragmento.path, grupo.id, grupo.num_rows)
+            for fragmento in _dataset_parquet(parquet_dir).get_fragments()
+            for grupo in fragmento.row_groups]
+
+
+def leer_grupos_de_filas(parquet_dir, piezas, columnas=None, chunksize=TAMANO_BLOQUE):
+    # piezas: [(archivo, [ids de row groups])] -> bloques (DEPTO sale de la carpeta del archivo)
+    columnas = columnas or COLUMNAS_CENSO
+    dataset = _dataset_parquet(parquet_dir)
+    fragmentos = {f.path: f for f in dataset.get_fragments()}
+    for ruta, ids in piezas:
+        subconjunto = fragmentos[ruta].subset(row_group_ids=ids)
+        for lote in subconjunto.to_batches(schema=dataset.schema, columns=list(columnas), batch_size=chunksize):
+            if lote.num_rows:
+                yield _a_pandas(lote)
+
+
+def preparar_parquet(file_path, parquet_dir, columnas=None, chunksize=TAMANO_BLOQUE):
+    # Deja listo el Parquet (lo crea o lo rehace si hace falta).
+    # Devuelve False si no hay pyarrow instalado y hay que seguir con el CSV.
+    try:
+        if not parquet_vigente(file_path, parquet_dir, columnas):
+            print(f"🧱 Convirtiendo CSV a Parquet (solo esta vez) en {parquet_dir}...")
+            # Se conservan las columnas extra de conversiones anteriores (MUNIC, ID_VIV...):
+            # si no, pedir unas y luego otras rehace el Parquet en cada corrida
+            previas = (leer_metadata_parquet(parquet_dir) or {}).get('columnas', [])
+            encabezado = leer_encabezado(file_path)
+            todas = list(dict.fromkeys(COLUMNAS_CENSO + [c for c in previas if c in encabezado]
+                                       + list(columnas or [])))
+            convertir_a_parquet(file_path, parquet_dir, todas, chunksize)
+        return True
+    except ImportError:
+        print("⚠️ pyarrow no está instalado: leyendo directo del CSV.")
+        return False
+
+
+def abrir_censo(file_path, parquet_dir=None, columnas=None, deptos=None, chunksize=TAMANO_BLOQUE):
+    # Punto de entrada único: usa el Parquet si existe (o lo crea la primera vez),
+    # y si no hay pyarrow instalado cae al CSV de siempre.
+    # Un flujo ya abierto (no una ruta) se lee tal cual, sin Parquet: no hay huella que comparar.
+    if parquet_dir and es_ruta(file_path) and preparar_parquet(file_path, parquet_dir, columnas, chunksize):
+        return leer_parquet_por_bloques(parquet_dir, columnas, deptos, chunksize)
+
+    bloques = leer_censo_por_bloques(file_path, columnas, chunksize)
+    if deptos is None:
+        return bloques
+    return (b[b['DEPTO'].isin(deptos)] for b in bloques)
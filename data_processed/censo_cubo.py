@@ -0,0 +1,245 @@
+# %%
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from censo_agregados import codigos_deptos, variables_tic
+from censo_carga import es_si
+from censo_diccionario import etiquetar
+from censo_instrumentacion import SIN_REPORTE
+from censo_recodificacion import (recodificar_codigos, etiquetas, NIVEL_EDUCATIVO, SEXO)
+
+# ==========================================
+# --- CUBO CENSAL (OLAP) PRE-CALCULADO ---
+# ==========================================
+# Cada pregunta nueva ("educación por sexo", "TIC por edad", "inglés por nivel"...)
+# obligaba a editar 01_procesar_datos.py y volver a leer los 6M de registros.
+# El cubo cuenta UNA vez a las personas en TODAS las combinaciones de las dimensiones
+# de baja cardinalidad que ya usamos:
+#   COD_PER válido x Depto x Sexo x Edad x Nivel educativo x Inglés x cada TIC (6)
+# = ~14M de celdas uint32 (~55 MB en RAM, muy poco en disco porque casi todo es 0).
+# Cualquier cruce sale de sumar ejes del arreglo en milisegundos, y los resumen_*.csv
+# de siempre son proyecciones del cubo (ver resumenes_desde_cubo).
+#
+# Uso:
+#   cubo = CuboCenso.cargar(ruta)
+#   cubo.consultar(por=['DEPTO', 'SEXO'], donde={'EDAD': range(10, 151), 'Internet': [1]})
+#   (o desde 01_procesar_datos.py --cubo, que lo construye en la misma pasada del censo)
+#
+# Límite: edades > EDAD_MAXIMA caen en "sin dato" (en resumen_edades.csv desaparecerían).
+
+EDAD_MAXIMA = 150
+DEPTO_MAXIMO = max(codigos_deptos) + 1        # 15 = código especial que trae el censo
+
+# Dimensión -> etiquetas de cada posición. La última posición de DEPTO y EDAD es
+# "sin dato" (vacíos o códigos fuera de rango).
+DIMENSIONES = {
+    'COD_PER_VALIDO': [0, 1],
+    'DEPTO': list(range(DEPTO_MAXIMO + 1)) + [None],
+    'SEXO': etiquetas(SEXO, "Sin dato"),
+    'EDAD': list(range(EDAD_MAXIMA + 1)) + [None],
+    'NIVEL': etiquetas(NIVEL_EDUCATIVO),
+    'INGLES': [0, 1],
+    **{nombre: [0, 1] for nombre in variables_tic.values()},
+}
+NOMBRES = list(DIMENSIONES)
+FORMA = tuple(len(v) for v in DIMENSIONES.values())
+
+
+def _codigo_numerico(columna, maximo):
+    # Código entero -> posición; vacíos y fuera de rango -> última posición
+    valores = columna.to_numpy(dtype='int64', na_value=-1)
+    return np.where((valores >= 0) & (valores <= maximo), valores, maximo + 1)
+
+
+def _posiciones(df):
+    # Una posición (entero) por fila y por dimensión, en el orden de DIMENSIONES
+    posiciones = [
+        df['COD_PER'].notna().to_numpy(dtype='int64'),
+        _codigo_numerico(df['DEPTO'], DEPTO_MAXIMO),
+        recodificar_codigos(df['P02_2_SEXO'], SEXO, "Sin dato").codes.astype('int64'),
+        _codigo_numerico(df['P02_3_EDAD'], EDAD_MAXIMA),
+        recodificar_codigos(df['P10_1_GRADO_APROBADO'], NIVEL_EDUCATIVO).codes.astype('int64'),
+        es_si(df['P12_3_A_ENG']).to_numpy(dtype='int64'),
+    ]
+    posiciones += [es_si(df[col]).to_numpy(dtype='int64') for col in variables_tic]
+    return posiciones
+
+
+class CuboCenso:
+    def __init__(self, conteos=None):
+        self.conteos = np.zeros(FORMA, dtype='uint32') if conteos is None else conteos
+
+    def agregar_bloque(self, df):
+        # Índice plano de cada fila en el cubo; np.unique cuenta sin crear un arreglo de 14M por bloque
+        indice = np.ravel_multi_index(_posiciones(df), FORMA)
+        celdas, cuantos = np.unique(indice, return_counts=True)
+        self.conteos.reshape(-1)[celdas] += cuantos.astype('uint32')
+        return self
+
+    def __add__(self, otro):
+        return CuboCenso(self.conteos + otro.conteos)
+
+    def __len__(self):
+        # Celdas con al menos una persona (equivale a las "filas" de la tabla base)
+        return int(np.count_nonzero(self.conteos))
+
+    @property
+    def total(self):
+        return int(self.conteos.sum(dtype='int64'))
+
+    # --- Disco ---
+    def guardar(self, ruta):
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        np.savez_compressed(ruta, conteos=self.conteos,
+                            dimensiones=json.dumps(DIMENSIONES, ensure_ascii=False))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as datos:
+            if json.loads(str(datos['dimensiones'])) != json.loads(json.dumps(DIMENSIONES)):
+                raise ValueError(f"El cubo {ruta} fue creado con otras dimensiones; vuelve a construirlo")
+            return cls(datos['conteos'])
+
+    # --- Consultas ---
+    def consultar(self, por=(), donde=None):
+        # por: dimensiones que quedan como filas; donde: {dimensión: valores a incluir}.
+        # Devuelve una Serie de conteos (solo combinaciones con al menos 1 persona).
+        arreglo = self.conteos
+        etiquetas_por = {}
+        for eje, nombre in enumerate(NOMBRES):
+            valores = DIMENSIONES[nombre]
+            if donde and nombre in donde:
+                permitidos = set(donde[nombre])
+                indices = [i for i, v in enumerate(valores) if v in permitidos]
+                arreglo = arreglo.take(indices, axis=eje)
+                valores = [valores[i] for i in indices]
+            etiquetas_por[nombre] = valores
+
+        ejes_a_sumar = tuple(i for i, n in enumerate(NOMBRES) if n not in por)
+        reducido = arreglo.sum(axis=ejes_a_sumar, dtype='int64')
+        if not por:
+            return int(reducido)
+
+        # Reordenar ejes según el orden pedido en "por"
+        restantes = [n for n in NOMBRES if n in por]
+        reducido = np.moveaxis(reducido, [restantes.index(n) for n in por], range(len(por)))
+        indice = pd.MultiIndex.from_product([etiquetas_por[n] for n in por], names=list(por))
+        serie = pd.Series(reducido.reshape(-1), index=indice, name='Conteo')
+        if len(por) == 1:
+            serie.index = serie.index.get_level_values(0)
+        return serie[serie > 0]
+
+
+def construir_cubo(bloques, al_avanzar=None, reporte=SIN_REPORTE):
+    # Misma firma que agregar(): devuelve (cubo, total de registros)
+    cubo = CuboCenso()
+    total = 0
+    bloques = iter(bloques)
+    for i in itertools.count(1):
+        with reporte.etapa('carga') as e:
+            bloque = next(bloques, None)
+            e['filas_salida'] = 0 if bloque is None else len(bloque)
+        if bloque is None:
+            break
+        with reporte.etapa('cubo', filas_entrada=len(bloque)):
+            cubo.agregar_bloque(bloque)
+        total += len(bloque)
+        if al_avanzar:
+            al_avanzar(i, total)
+    return cubo, total
+
+
+def combinar_cubos(acumulado, parcial):
+    return parcial if acumulado is None else acumulado + parcial
+
+
+# ==========================================
+# --- LOS RESUMEN_*.CSV DE SIEMPRE COMO PROYECCIONES DEL CUBO ---
+# ==========================================
+CON_DEPTO = {'DEPTO': range(DEPTO_MAXIMO + 1)}
+EDAD_4_MAS = range(4, EDAD_MAXIMA + 1)
+EDAD_10_MAS = range(10, EDAD_MAXIMA + 1)
+
+
+def _tabla(serie, nombre):
+    return serie.rename(nombre).reset_index()
+
+
+def resumen_deptos(cubo):
+    # Deptos con al menos un registro; Poblacion/Mujeres/Hombres cuentan solo COD_PER válido
+    registros = cubo.consultar(['DEPTO'], CON_DEPTO)
+    personas = cubo.consultar(['DEPTO', 'SEXO'], {**CON_DEPTO, 'COD_PER_VALIDO': [1]})
+    personas = personas.unstack(fill_value=0).reindex(index=registros.index, columns=DIMENSIONES['SEXO'],
+                                                       fill_value=0)
+    df_deptos = pd.DataFrame({
+        'DEPTO': registros.index.to_numpy(dtype='int64'),
+        'Poblacion': personas.sum(axis=1).to_numpy(dtype='int64'),
+        'Mujeres': personas['Mujer'].to_numpy(dtype='int64'),
+        'Hombres': personas['Hombre'].to_numpy(dtype='int64'),
+    })
+    df_deptos['Nombre_Depto'] = etiquetar(df_deptos['DEPTO'], 'DEPTO')
+    return df_deptos
+
+
+def resumen_edades(cubo):
+    df_edades = _tabla(cubo.consultar(['EDAD'], {'EDAD': range(EDAD_MAXIMA + 1)}), 'Frecuencia')
+    df_edades.columns = ['Edad', 'Frecuencia']
+    return df_edades.astype('int64')
+
+
+def resumen_educacion(cubo):
+    conteo = cubo.consultar(['DEPTO', 'NIVEL'], {**CON_DEPTO, 'EDAD': EDAD_4_MAS})
+    resumen = _tabla(conteo, 'Conteo').rename(columns={'NIVEL': 'Nivel_Educativo'})
+    # Mismo orden que el groupby de siempre: Depto y luego nombre del nivel (alfabético)
+    resumen = resumen.sort_values(['DEPTO', 'Nivel_Educativo']).reset_index(drop=True)
+    resumen['DEPTO'] = resumen['DEPTO'].astype('int64')
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen
+
+
+def _personas_y_si(cubo, edades, columnas):
+    # Personas con COD_PER (denominador) y suma de cada indicador 1=Sí (numeradores)
+    filtro = {**CON_DEPTO, 'EDAD': edades}
+    registros = cubo.consultar(['DEPTO'], filtro)
+    tabla = pd.DataFrame(index=registros.index)
+    tabla['Personas'] = cubo.consultar(['DEPTO'], {**filtro, 'COD_PER_VALIDO': [1]})
+    for dimension, nombre in columnas.items():
+        tabla[nombre] = cubo.consultar(['DEPTO'], {**filtro, dimension: [1]})
+    tabla = tabla.fillna(0).astype('int64')
+    tabla.index = tabla.index.astype('int64')
+    return tabla.rename_axis('DEPTO').reset_index()
+
+
+def resumen_ingles(cubo):
+    resumen = _personas_y_si(cubo, EDAD_4_MAS, {'INGLES': 'Hablantes_Ingles'})
+    resumen = resumen.rename(columns={'Personas': 'Poblacion_4plus'})
+    resumen['Pct_Ingles'] = (resumen['Hablantes_Ingles'] / resumen['Poblacion_4plus']) * 100
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen
+
+
+def resumen_tic(cubo):
+    cols_tic = list(variables_tic.values())
+    resumen = _personas_y_si(cubo, EDAD_10_MAS, {c: c for c in cols_tic})
+    resumen = resumen.rename(columns={'Personas': 'Total_Pob'})
+    for col in cols_tic:
+        resumen[f'Pct_{col}'] = (resumen[col] / resumen['Total_Pob']) * 100
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen
+
+
+PROYECCIONES = {
+    'resumen_deptos.csv': resumen_deptos,
+    'resumen_edades.csv': resumen_edades,
+    'resumen_educacion.csv': resumen_educacion,
+    'resumen_ingles.csv': resumen_ingles,
+    'resumen_tic_completo.csv': resumen_tic,
+}
+
+
+def resumenes_desde_cubo(cubo):
+    return {archivo: funcion(cubo) for archivo, funcion in PROYECCIONES.items()}
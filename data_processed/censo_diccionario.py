@@ -0,0 +1,152 @@
+# %%
+import numpy as np
+
+from censo_recodificacion import recodificar_codigos, NIVEL_EDUCATIVO, SEXO
+
+# ==========================================
+# --- DICCIONARIO DE DATOS DEL CENSO ---
+# ==========================================
+# Un solo lugar con lo que significa cada variable del CSV: tipo compacto, códigos
+# válidos y etiquetas (o tabla de recodificación). De aquí salen:
+#   - los dtypes con que se lee el CSV (censo_carga.DTYPES_CENSO),
+#   - la validación de códigos por bloque (Validador),
+#   - las etiquetas como Categorical (1 byte por fila en vez de un string por fila),
+#   - la búsqueda de variables en "import pandas as pd.py".
+#
+# Cada variable: {'tipo', 'descripcion', 'validos': (desde, hasta), 'tabla' (opcional),
+#                 'opcional' (la columna no viene en todas las versiones del CSV),
+#                 'archivo' ('poblacion' si se omite; 'vivienda' = base de viviendas)}
+
+codigos_deptos = {
+    1: "Ahuachapán", 2: "SantaAna", 3: "Sonsonate", 4: "Chalatenango",
+    5: "LaLibertad", 6: "San Salvador", 7: "Cuscatlán", 8: "LaPaz",
+    9: "Cabañas", 10: "SanVicente", 11: "Usulután", 12: "SanMiguel",
+    13: "Morazán", 14: "LaUnión"
+}
+
+# Preguntas Sí/No del censo
+SI_NO = [(1, 1, "Sí"), (2, 2, "No")]
+
+
+def _tabla_de_codigos(codigos):
+    # {código: etiqueta} -> tabla de rangos (desde, hasta, etiqueta) de censo_recodificacion
+    return [(c, c, e) for c, e in codigos.items()]
+
+
+DICCIONARIO = {
+    'DEPTO': {'tipo': 'Int8', 'descripcion': "Departamento (15 = código especial del censo)",
+              'validos': (1, 15), 'tabla': _tabla_de_codigos(codigos_deptos)},
+    'COD_PER': {'tipo': 'Int32', 'descripcion': "Número de la persona dentro de la vivienda",
+                'validos': (1, 99)},
+    'P02_2_SEXO': {'tipo': 'Int8', 'descripcion': "Sexo", 'validos': (1, 2), 'tabla': SEXO},
+    'P02_3_EDAD': {'tipo': 'Int16', 'descripcion': "Edad en años cumplidos", 'validos': (0, 130)},
+    'P10_1_GRADO_APROBADO': {'tipo': 'Int8', 'descripcion': "Último grado aprobado (>= 4 años)",
+                             'validos': (0, 99), 'tabla': NIVEL_EDUCATIVO},
+    'P12_3_A_ENG': {'tipo': 'Int8', 'descripcion': "Habla inglés", 'validos': (1, 2), 'tabla': SI_NO},
+    'P14_1_USO_TIC_PC': {'tipo': 'Int8', 'descripcion': "Usó computadora de escritorio (>= 10 años)",
+                         'validos': (1, 2), 'tabla': SI_NO},
+    'P14_2_USO_TIC_LAPTOP': {'tipo': 'Int8', 'descripcion': "Usó laptop (>= 10 años)",
+                             'validos': (1, 2), 'tabla': SI_NO},
+    'P14_3_USO_TIC_TABLET': {'tipo': 'Int8', 'descripcion': "Usó tablet (>= 10 años)",
+                             'validos': (1, 2), 'tabla': SI_NO},
+    'P14_4_USO_TIC_SMARTPHONE': {'tipo': 'Int8', 'descripcion': "Usó smartphone (>= 10 años)",
+                                 'validos': (1, 2), 'tabla': SI_NO},
+    'P14_5_USO_TIC_CEL': {'tipo': 'Int8', 'descripcion': "Usó celular básico (>= 10 años)",
+                          'validos': (1, 2), 'tabla': SI_NO},
+    'P14_6_USO_TIC_INTERNET': {'tipo': 'Int8', 'descripcion': "Usó internet (>= 10 años)",
+                               'validos': (1, 2), 'tabla': SI_NO},
+    'MUNIC': {'tipo': 'Int16', 'descripcion': "Municipio dentro del departamento",
+              'validos': (1, 99), 'opcional': True},
+    # Llave de la vivienda: está en las dos bases (población y vivienda), ver censo_vivienda.py
+    'ID_VIV': {'tipo': 'Int64', 'descripcion': "Identificador de la vivienda",
+               'validos': (1, 10**12), 'opcional': True},
+
+    # --- BASE DE VIVIENDAS (una fila por vivienda) ---
+    # IMPORTANTE: nombres y códigos según el diccionario de la base de vivienda del CPV2024;
+    # revisa con "import pandas as pd.py" apuntando al CSV de vivienda.
+    'AGUA': {'tipo': 'Int8', 'descripcion': "Abastecimiento de agua (1-2 = cañería)",
+             'validos': (1, 9), 'archivo': 'vivienda'},
+    'LUZ': {'tipo': 'Int8', 'descripcion': "Alumbrado (1 = red eléctrica)",
+            'validos': (1, 9), 'archivo': 'vivienda'},
+    'PISO': {'tipo': 'Int8', 'descripcion': "Material del piso (9 = tierra)",
+             'validos': (1, 9), 'archivo': 'vivienda'},
+    'PARED': {'tipo': 'Int8', 'descripcion': "Material de las paredes (1-2 = concreto/mixto)",
+              'validos': (1, 9), 'archivo': 'vivienda'},
+    'TECHO': {'tipo': 'Int8', 'descripcion': "Material del techo (1-3 = losa/lámina/teja)",
+              'validos': (1, 9), 'archivo': 'vivienda'},
+    'INTERNET': {'tipo': 'Int8', 'descripcion': "El hogar tiene conexión a internet",
+                 'validos': (1, 2), 'tabla': SI_NO, 'archivo': 'vivienda'},
+}
+
+
+def columnas_de(archivo='poblacion'):
+    # Variables del diccionario que vienen en cada base del censo
+    return [c for c, variable in DICCIONARIO.items() if variable.get('archivo', 'poblacion') == archivo]
+
+
+# --- VALIDACIÓN ---
+def validar_bloque(df):
+    # {columna: cuántos valores NO vacíos caen fuera de los códigos válidos}
+    invalidos = {}
+    for columna in df.columns:
+        if columna not in DICCIONARIO:
+            continue
+        desde, hasta = DICCIONARIO[columna]['validos']
+        valores = df[columna].to_numpy(dtype='float64', na_value=np.nan)
+        invalidos[columna] = int(((valores < desde) | (valores > hasta)).sum())
+    return invalidos
+
+
+class Validador:
+    # Se pone "en medio" de los bloques (no agrega otra pasada al censo):
+    #   validador = Validador(); agregar(validador.observar(bloques)); validador.imprimir()
+    def __init__(self):
+        self.invalidos = {}
+        # Celdas que no eran números y se leyeron como vacías, y números con decimales o
+        # fuera del tipo compacto que se truncaron/saturaron (ver censo_carga.CONTEOS_CARGA)
+        self.no_numericos = {}
+        self.ajustados = {}
+        self.filas = 0
+
+    def observar(self, bloques):
+        for bloque in bloques:
+            for columna, n in validar_bloque(bloque).items():
+                self.invalidos[columna] = self.invalidos.get(columna, 0) + n
+            for columna, n in bloque.attrs.get('no_numericos', {}).items():
+                self.no_numericos[columna] = self.no_numericos.get(columna, 0) + n
+            for columna, n in bloque.attrs.get('ajustados', {}).items():
+                self.ajustados[columna] = self.ajustados.get(columna, 0) + n
+            self.filas += len(bloque)
+            yield bloque
+
+    def imprimir(self):
+        for columna, n in self.no_numericos.items():
+            if n:
+                print(f"⚠️ {columna}: {n:,} celdas que no son un número (quedaron vacías)")
+        for columna, n in self.ajustados.items():
+            if n:
+                print(f"⚠️ {columna}: {n:,} números con decimales o fuera del tipo (se truncaron o saturaron)")
+        con_errores = {c: n for c, n in self.invalidos.items() if n}
+        if not con_errores:
+            print(f"✅ Códigos válidos en las {len(self.invalidos)} variables revisadas.")
+            return
+        for columna, n in con_errores.items():
+            desde, hasta = DICCIONARIO[columna]['validos']
+            print(f"⚠️ {columna}: {n:,} valores fuera de {desde}-{hasta} ({n / self.filas:.2%} de las filas)")
+
+
+# --- ETIQUETAS COMO CATEGORICAL ---
+def etiquetar(valores, columna):
+    # Código -> etiqueta del diccionario con una búsqueda en arreglo (sin .map de strings).
+    # Devuelve Categorical; códigos sin etiqueta quedan vacíos, igual que con .map(dict).
+    tabla = DICCIONARIO[columna]['tabla']
+    return recodificar_codigos(valores, tabla, por_defecto=None, maximo=DICCIONARIO[columna]['validos'][1])
+
+
+# --- BÚSQUEDA DE VARIABLES ---
+def describir_columnas(columnas, archivo='poblacion'):
+    # Variables del diccionario presentes/ausentes en un CSV y columnas sin declarar
+    presentes = [c for c in DICCIONARIO if c in columnas]
+    faltantes = [c for c in columnas_de(archivo) if c not in columnas and not DICCIONARIO[c].get('opcional')]
+    sin_declarar = [c for c in columnas if c not in DICCIONARIO]
+    return presentes, faltantes, sin_declarar
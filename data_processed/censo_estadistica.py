@@ -0,0 +1,122 @@
+# %%
+import numpy as np
+import pandas as pd
+
+from censo_agregados import variables_tic
+from censo_diccionario import etiquetar
+
+# ==========================================
+# --- PROPORCIONES CON ERROR ESTÁNDAR E INTERVALOS ---
+# ==========================================
+# Los Pct_* (Internet, Inglés...) son cocientes "numerador / denominador" sin medida de
+# incertidumbre. Para los deptos y, sobre todo, las áreas chicas (municipios) aquí se calculan:
+#   - error estándar binomial,
+#   - intervalo de Wilson (analítico, se porta bien con pocos casos o p cerca de 0/1),
+#   - intervalo bootstrap por percentiles, TODAS las réplicas de una vez como una matriz
+#     réplicas x grupos (sin bucles de Python).
+#
+# Todo trabaja sobre TOTALES por grupo (lo que ya produce la agregación), no sobre
+# microdatos: remuestrear n personas 0/1 con reemplazo equivale a una Binomial(n, p),
+# así que el bootstrap sale directo de los conteos.
+
+REPLICAS = 1000
+NIVEL_CONFIANZA = 0.95
+SEMILLA = 2024
+
+# Indicador -> (numerador, denominador) en los resumen_*.csv
+INDICADORES_DEPTO = {
+    'Pct_Ingles': ('Hablantes_Ingles', 'Poblacion_4plus'),
+    **{f'Pct_{nombre}': (nombre, 'Total_Pob') for nombre in variables_tic.values()},
+}
+INDICADORES_MUNICIPIO = {
+    'Pct_Ingles': ('Hablantes_Ingles', 'Poblacion_4plus'),
+    **{f'Pct_{nombre}': (nombre, 'Total_Pob_10plus') for nombre in variables_tic.values()},
+}
+
+
+def _z(nivel=NIVEL_CONFIANZA):
+    from statistics import NormalDist
+    return NormalDist().inv_cdf(0.5 + nivel / 2)
+
+
+def _dividir(a, b):
+    a, b = np.asarray(a, dtype='float64'), np.asarray(b, dtype='float64')
+    return np.divide(a, b, out=np.full(np.broadcast(a, b).shape, np.nan), where=b > 0)
+
+
+# --- INTERVALOS ---
+def error_estandar(p, n):
+    return np.sqrt(_dividir(p * (1 - p), n))
+
+
+def intervalo_wilson(p, n, nivel=NIVEL_CONFIANZA):
+    z = _z(nivel)
+    n = np.asarray(n, dtype='float64')
+    # n = 0 -> NaN (con _dividir, sin avisos de división entre cero)
+    escala = 1 + _dividir(z * z, n)
+    centro = _dividir(p + _dividir(z * z, 2 * n), escala)
+    radio = _dividir(z * np.sqrt(_dividir(p * (1 - p), n) + _dividir(z * z, 4 * n * n)), escala)
+    return centro - radio, centro + radio
+
+
+def replicas_bootstrap(p, n, replicas=REPLICAS, semilla=SEMILLA):
+    # Matriz réplicas x grupos de proporciones remuestreadas (un solo llamado a NumPy)
+    rng = np.random.default_rng(semilla)
+    n = np.nan_to_num(np.round(np.asarray(n, dtype='float64')), nan=0).astype('int64')
+    p = np.nan_to_num(np.asarray(p, dtype='float64'), nan=0)
+    exitos = rng.binomial(n[None, :], p[None, :], size=(replicas, len(n)))
+    return _dividir(exitos, n[None, :])
+
+
+def intervalo_bootstrap(matriz, nivel=NIVEL_CONFIANZA):
+    # Percentiles por columna (grupo) de la matriz de réplicas
+    # (grupos sin casos, n = 0, son columnas todas NaN: quedan NaN sin pasar por nanquantile)
+    alfa = (1 - nivel) / 2
+    li, ls = np.full(matriz.shape[1], np.nan), np.full(matriz.shape[1], np.nan)
+    con_datos = ~np.isnan(matriz).all(axis=0)
+    li[con_datos], ls[con_datos] = np.nanquantile(matriz[:, con_datos], [alfa, 1 - alfa], axis=0)
+    return li, ls
+
+
+# --- TABLAS ---
+def tabla_intervalos(resumen, claves, indicadores, replicas=REPLICAS, nivel=NIVEL_CONFIANZA, semilla=SEMILLA):
+    # Formato largo: una fila por grupo x indicador. Todos los indicadores y grupos se
+    # procesan juntos (grupos*indicadores columnas en la misma matriz de réplicas).
+    bloques = []
+    for indicador, (numerador, denominador) in indicadores.items():
+        bloques.append(pd.DataFrame({
+            **{c: resumen[c].to_numpy() for c in claves},
+            'Indicador': indicador,
+            # Un grupo que no aparece en algún resumen (ej. un depto sin personas de 10+) cuenta 0
+            'Numerador': resumen[numerador].fillna(0).to_numpy(dtype='int64'),
+            'Denominador': resumen[denominador].fillna(0).to_numpy(dtype='int64'),
+        }))
+    tabla = pd.concat(bloques, ignore_index=True)
+
+    n = tabla['Denominador'].to_numpy(dtype='float64')
+    p = _dividir(tabla['Numerador'], n)
+    wilson_li, wilson_ls = intervalo_wilson(p, n, nivel)
+    boot_li, boot_ls = intervalo_bootstrap(replicas_bootstrap(p, n, replicas, semilla), nivel)
+    tabla['Pct'] = p * 100
+    tabla['EE'] = error_estandar(p, n) * 100
+    tabla['Wilson_LI'], tabla['Wilson_LS'] = wilson_li * 100, wilson_ls * 100
+    tabla['Boot_LI'], tabla['Boot_LS'] = boot_li * 100, boot_ls * 100
+    return tabla
+
+
+def intervalos_deptos(resumenes, replicas=REPLICAS):
+    # Une inglés y TIC por depto y calcula los intervalos de todos los Pct_*
+    ingles = resumenes['resumen_ingles.csv']
+    tic = resumenes['resumen_tic_completo.csv']
+    tabla = ingles[['DEPTO', 'Hablantes_Ingles', 'Poblacion_4plus']].merge(
+        tic.drop(columns='Nombre_Depto'), on='DEPTO', how='outer')
+    # Con how='outer' un depto puede venir de un solo lado: conteos vacíos = 0
+    conteos = list(dict.fromkeys(c for par in INDICADORES_DEPTO.values() for c in par))
+    tabla[conteos] = tabla[conteos].fillna(0)
+    tabla.insert(1, 'Nombre_Depto', etiquetar(tabla['DEPTO'], 'DEPTO'))
+    return tabla_intervalos(tabla, ['DEPTO', 'Nombre_Depto'], INDICADORES_DEPTO, replicas)
+
+
+def intervalos_municipios(resumen, replicas=REPLICAS):
+    # Municipios: denominadores chicos, aquí es donde los intervalos importan
+    return tabla_intervalos(resumen, ['DEPTO', 'Nombre_Depto', 'MUNIC'], INDICADORES_MUNICIPIO, replicas)
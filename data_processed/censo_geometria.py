@@ -0,0 +1,119 @@
+# %%
+import os
+import unicodedata
+
+import geopandas as gpd
+import pandas as pd
+
+# ==========================================
+# --- GEOMETRÍA GADM CON CACHÉ LOCAL ---
+# ==========================================
+# Antes 02_dashboard.py descargaba gadm41_SLV_1.json de geodata.ucdavis.edu en CADA
+# corrida (lento, y en las máquinas sin red simplemente fallaba).
+# Ahora:
+#   1. Si existe la caché (GeoParquet/GeoPackage ya simplificado) -> se lee al instante.
+#   2. Si no, se usa el GeoJSON original guardado en geo/ (o se descarga UNA vez).
+#   3. Se simplifica para la resolución del dashboard, se calculan match_key y el punto
+#      de la etiqueta, y se guarda la caché.
+# Subir la carpeta geo/ al repo deja todo listo para las máquinas sin internet.
+
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "geo")
+
+# Nivel GADM -> (URL del GeoJSON original, columna con el nombre)
+FUENTES_GADM = {
+    1: ("https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_SLV_1.json", "NAME_1"),
+    2: ("https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_SLV_2.json", "NAME_2"),
+}
+
+# Código del censo (DEPTO, MUNIC) -> nombre del municipio en GADM: con esto se une
+# resumen_municipios.csv al mapa. Columnas DEPTO, MUNIC, Nombre_Municipio (ver tabla_municipios)
+ARCHIVO_MUNICIPIOS = os.path.join(GEO_DIR, "municipios_censo.csv")
+
+# Tolerancia en grados (~200 m): a 300 dpi en el mapa del país no se nota,
+# y reduce muchísimo los vértices a dibujar
+TOLERANCIA = 0.002
+# Los municipios son mucho más chicos: la mitad (~100 m) para que no se deformen
+TOLERANCIAS = {1: TOLERANCIA, 2: TOLERANCIA / 2}
+
+
+def normalizar(texto):
+    if not isinstance(texto, str): return "SIN_DATO"
+    return unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('utf-8').upper().replace(" ", "").strip()
+
+
+def _geojson_original(nivel):
+    url, _ = FUENTES_GADM[nivel]
+    ruta = os.path.join(GEO_DIR, os.path.basename(url))
+    if not os.path.exists(ruta):
+        print(f"🗺️ Descargando geometría (solo esta vez): {url}")
+        os.makedirs(GEO_DIR, exist_ok=True)
+        gpd.read_file(url).to_file(ruta, driver="GeoJSON")
+    return gpd.read_file(ruta)
+
+
+def simplificar(gdf, tolerancia=TOLERANCIA):
+    # coverage_simplify (shapely >= 2.1) simplifica los bordes COMPARTIDOS una sola vez,
+    # así no quedan huecos ni traslapes entre departamentos vecinos
+    import shapely
+    gdf = gdf.copy()
+    if hasattr(shapely, "coverage_simplify"):
+        gdf['geometry'] = shapely.coverage_simplify(gdf.geometry.values, tolerancia, simplify_boundary=True)
+    else:
+        gdf['geometry'] = gdf.geometry.simplify(tolerancia, preserve_topology=True)
+    return gdf
+
+
+def _ruta_cache(nivel, tolerancia, extension):
+    return os.path.join(GEO_DIR, f"gadm41_SLV_{nivel}_simple_{tolerancia:g}.{extension}")
+
+
+def cargar_mapa(nivel=1, tolerancia=None):
+    # GeoDataFrame listo para dibujar: geometry simplificada + match_key + label_x/label_y
+    # (nivel 2 trae además match_key_depto: hay nombres de municipio repetidos entre deptos)
+    tolerancia = TOLERANCIAS[nivel] if tolerancia is None else tolerancia
+    for extension, lector in (("parquet", gpd.read_parquet), ("gpkg", gpd.read_file)):
+        ruta = _ruta_cache(nivel, tolerancia, extension)
+        if os.path.exists(ruta):
+            return lector(ruta)
+
+    _, campo_nombre = FUENTES_GADM[nivel]
+    gdf = _geojson_original(nivel)
+
+    # Punto de la etiqueta sobre la geometría ORIGINAL (siempre cae dentro del polígono)
+    puntos = gdf.representative_point()
+    gdf = simplificar(gdf, tolerancia)
+    gdf['match_key'] = gdf[campo_nombre].apply(normalizar)
+    if nivel > 1:
+        gdf['match_key_depto'] = gdf['NAME_1'].apply(normalizar)
+    gdf['label_x'] = puntos.x
+    gdf['label_y'] = puntos.y
+
+    os.makedirs(GEO_DIR, exist_ok=True)
+    try:
+        gdf.to_parquet(_ruta_cache(nivel, tolerancia, "parquet"))
+    except ImportError:
+        # Sin pyarrow: GeoPackage (solo necesita lo que ya trae geopandas)
+        gdf.to_file(_ruta_cache(nivel, tolerancia, "gpkg"), driver="GPKG")
+    return gdf
+
+
+def tabla_municipios():
+    # Equivalencias DEPTO/MUNIC -> nombre. Si geo/municipios_censo.csv no existe se arma desde
+    # la capa GADM nivel 2: DEPTO por el nombre del depto (codigos_deptos del diccionario) y
+    # MUNIC numerando los municipios de cada depto en orden alfabético, que es como vienen
+    # casi todos los códigos del censo. Se guarda en geo/ para revisarlo contra el diccionario
+    # del censo y corregir a mano los que no sigan ese orden (se respeta en las corridas siguientes).
+    if os.path.exists(ARCHIVO_MUNICIPIOS):
+        return pd.read_csv(ARCHIVO_MUNICIPIOS)
+    from censo_diccionario import codigos_deptos
+
+    gdf = cargar_mapa(nivel=2)
+    deptos = {normalizar(nombre): codigo for codigo, nombre in codigos_deptos.items()}
+    tabla = pd.DataFrame({'DEPTO': gdf['match_key_depto'].map(deptos), 'clave': gdf['match_key'],
+                          'Nombre_Municipio': gdf['NAME_2']})
+    tabla = tabla.dropna(subset=['DEPTO']).sort_values(['DEPTO', 'clave'])
+    tabla['MUNIC'] = tabla.groupby('DEPTO').cumcount() + 1
+    tabla = tabla.astype({'DEPTO': 'int64'})[['DEPTO', 'MUNIC', 'Nombre_Municipio']].reset_index(drop=True)
+    tabla.to_csv(ARCHIVO_MUNICIPIOS, index=False, encoding='utf-8')
+    print(f"🗺️ Tabla de municipios generada desde GADM (revísala contra el diccionario): {ARCHIVO_MUNICIPIOS}")
+    return tabla
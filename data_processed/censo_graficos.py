@@ -0,0 +1,91 @@
+# %%
+import functools
+
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.patheffects as pe
+
+# ==========================================
+# --- CAPA COMÚN DE GRÁFICOS: ETIQUETAS EN LOTE Y PLANTILLAS ---
+# ==========================================
+# Los dashboards armaban cada etiqueta dentro de un iterrows(): una Serie de pandas por
+# fila, formato con f-strings y un estilo (contorno, fuente) nuevo por etiqueta. Con 14
+# deptos no se nota; con cientos de municipios o muchas variantes sí.
+# Aquí las POSICIONES y los TEXTOS se calculan de una vez por columna (arreglos de NumPy)
+# y todas las etiquetas comparten el mismo estilo. Para mapas con varias variantes,
+# PlantillaMapa dibuja la geometría UNA vez y cada variante solo cambia los colores.
+
+
+# --- POSICIONES ---
+def puntos_etiqueta(gdf):
+    # (x, y) de cada región: label_x/label_y si vienen precalculados (censo_geometria),
+    # si no, representative_point() de toda la GeoSeries de una vez
+    if {'label_x', 'label_y'} <= set(gdf.columns):
+        return gdf['label_x'].to_numpy(dtype='float64'), gdf['label_y'].to_numpy(dtype='float64')
+    puntos = gdf.geometry.representative_point()
+    return puntos.x.to_numpy(), puntos.y.to_numpy()
+
+
+# --- TEXTOS (ARREGLOS DE STRINGS) ---
+def formatear(formato, valores):
+    # Formato estilo printf para todo un arreglo: formatear('%.0f%%', serie) -> ['45%', ...]
+    return np.char.mod(formato, np.asarray(valores, dtype='float64'))
+
+
+def formatear_cantidad(valores):
+    # 1.234.567 -> "1.2M"; 45.600 -> "46K"
+    v = np.asarray(valores, dtype='float64')
+    return np.where(v >= 1e6, unir(formatear('%.1f', v / 1e6), 'M'), unir(formatear('%.0f', v / 1e3), 'K'))
+
+
+def unir(*partes):
+    # Concatena arreglos (o strings sueltos) elemento a elemento
+    return functools.reduce(np.char.add, [np.asarray(p, dtype=str) for p in partes])
+
+
+# --- DIBUJO ---
+def contorno(ancho, color="white"):
+    return [pe.withStroke(linewidth=ancho, foreground=color)]
+
+
+def etiquetar_puntos(ax, x, y, textos, **estilo):
+    # Todas las etiquetas con UN estilo compartido; textos vacíos o posiciones NaN se saltan.
+    # Devuelve los artistas (para quitarlos al cambiar de variante).
+    x, y, textos = np.asarray(x, dtype='float64'), np.asarray(y, dtype='float64'), np.asarray(textos, dtype=str)
+    validos = np.isfinite(x) & np.isfinite(y) & (textos != '')
+    return [ax.text(xi, yi, t, **estilo) for xi, yi, t in zip(x[validos], y[validos], textos[validos])]
+
+
+class PlantillaMapa:
+    # Figura + polígonos dibujados UNA vez. Cada variante (otra variable, otra paleta)
+    # cambia los colores de la MISMA colección (set_array) y reemplaza las etiquetas:
+    # generar N mapas cuesta N guardados, no N veces toda la geometría.
+    def __init__(self, gdf, ax=None, figsize=(20, 11), linewidth=0.2, edgecolor='white'):
+        import shapely
+
+        if ax is None:
+            self.fig, self.ax = plt.subplots(figsize=figsize)
+        else:
+            self.fig, self.ax = ax.figure, ax
+        gdf.plot(ax=self.ax, linewidth=linewidth, edgecolor=edgecolor)
+        self.coleccion = self.ax.collections[-1]
+        # geopandas separa cada MultiPolygon en sus partes: un valor por parte
+        self.partes = shapely.get_num_geometries(gdf.geometry.values)
+        self.barra = None
+        self.etiquetas = []
+
+    def pintar(self, valores, cmap='YlGnBu', sin_dato='#dddddd', titulo_barra=None):
+        # Coroplético con los valores de cada fila del gdf (NaN = sin dato)
+        valores = np.ma.masked_invalid(np.repeat(np.asarray(valores, dtype='float64'), self.partes))
+        self.coleccion.set_cmap(plt.get_cmap(cmap).with_extremes(bad=sin_dato))
+        self.coleccion.set_array(valores)
+        self.coleccion.set_clim(valores.min(), valores.max())
+        if self.barra is None:
+            self.barra = self.fig.colorbar(self.coleccion, ax=self.ax, shrink=0.6)
+        if titulo_barra:
+            self.barra.set_label(titulo_barra)
+
+    def etiquetar(self, x, y, textos, **estilo):
+        for texto in self.etiquetas:
+            texto.remove()
+        self.etiquetas = etiquetar_puntos(self.ax, x, y, textos, **estilo)
@@ -0,0 +1,170 @@
+# %%
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+# ==========================================
+# --- INSTRUMENTACIÓN POR ETAPA + REPORTE DE CORRIDA ---
+# ==========================================
+# Los print con emojis dicen QUÉ se está haciendo, pero no CUÁNTO tarda cada parte.
+# Aquí cada etapa (carga, agregación, resúmenes, exportar, dibujo...) registra:
+#   tiempo real, tiempo de CPU, filas que entran/salen y cambio de RAM.
+# Al final se agrega una línea por etapa al reporte NDJSON (reportes/corridas.ndjson),
+# así se pueden comparar corridas en el tiempo.
+#
+# Perfil opcional por etapa (variable de entorno o --perfil en 01_procesar_datos.py):
+#   CENSO_PERFIL=cprofile     -> reportes/perfiles/<corrida>_<etapa>.prof (abrir con snakeviz)
+#   CENSO_PERFIL=pyinstrument -> reportes/perfiles/<corrida>_<etapa>.html
+
+REPORTES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reportes")
+ARCHIVO_REPORTE = os.path.join(REPORTES_DIR, "corridas.ndjson")
+
+
+def rss_actual_mb():
+    # RAM residente AHORA (no el pico); None si no hay cómo medirla
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _Perfilador:
+    # Un perfilador por etapa; si la etapa se repite (ej. un bloque del CSV), se acumula
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self.sesiones = []
+        if tipo == 'cprofile':
+            import cProfile
+            self._perfil = cProfile.Profile()
+
+    def iniciar(self):
+        if self.tipo == 'cprofile':
+            self._perfil.enable()
+        else:
+            from pyinstrument import Profiler
+            self._perfil = Profiler()
+            self._perfil.start()
+
+    def detener(self):
+        if self.tipo == 'cprofile':
+            self._perfil.disable()
+        else:
+            self.sesiones.append(self._perfil.stop())
+
+    def guardar(self, ruta_base):
+        if self.tipo == 'cprofile':
+            self._perfil.dump_stats(ruta_base + ".prof")
+            return
+        from pyinstrument.renderers import HTMLRenderer
+        from pyinstrument.session import Session
+        sesion = self.sesiones[0]
+        for otra in self.sesiones[1:]:
+            sesion = Session.combine(sesion, otra)
+        with open(ruta_base + ".html", 'w', encoding='utf-8') as f:
+            f.write(HTMLRenderer().render(sesion))
+
+
+class Reporte:
+    def __init__(self, script, archivo=ARCHIVO_REPORTE, perfil=None):
+        self.script = script
+        self.archivo = archivo
+        self.perfil = perfil if perfil is not None else os.environ.get('CENSO_PERFIL') or None
+        self.corrida = time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+        self.etapas = {}          # nombre -> métricas acumuladas (en orden de aparición)
+        self._perfiles = {}
+        self._tramo = None
+
+    # --- Forma 1: bloque "with" (para código dentro de funciones) ---
+    @contextmanager
+    def etapa(self, nombre, filas_entrada=None):
+        # Uso:  with reporte.etapa('agregacion', filas_entrada=len(df)) as e:
+        #           ...; e['filas_salida'] = len(resultado)
+        info = {}
+        if self.perfil and nombre not in self._perfiles:
+            self._perfiles[nombre] = _Perfilador(self.perfil)
+        rss0 = rss_actual_mb()
+        t0, c0 = time.perf_counter(), time.process_time()
+        if self.perfil:
+            self._perfiles[nombre].iniciar()
+        try:
+            yield info
+        finally:
+            if self.perfil:
+                self._perfiles[nombre].detener()
+            rss1 = rss_actual_mb()
+            self._sumar(nombre, {
+                'veces': 1,
+                'tiempo_s': time.perf_counter() - t0,
+                'cpu_s': time.process_time() - c0,
+                'filas_entrada': filas_entrada,
+                'filas_salida': info.get('filas_salida'),
+                'delta_rss_mb': None if rss0 is None or rss1 is None else rss1 - rss0,
+            })
+            self.etapas[nombre]['rss_final_mb'] = rss1
+
+    # --- Forma 2: tramos (para scripts por celdas, sin re-indentar) ---
+    def tramo(self, nombre, filas_entrada=None):
+        # Cierra el tramo anterior (si hay) y abre uno nuevo
+        self.cerrar_tramo()
+        self._tramo = self.etapa(nombre, filas_entrada)
+        self._tramo_info = self._tramo.__enter__()
+
+    def filas_salida(self, n):
+        if self._tramo is not None:
+            self._tramo_info['filas_salida'] = n
+
+    def cerrar_tramo(self):
+        if self._tramo is not None:
+            self._tramo.__exit__(None, None, None)
+            self._tramo = None
+
+    def _sumar(self, nombre, medida):
+        actual = self.etapas.setdefault(nombre, {})
+        for clave, valor in medida.items():
+            if valor is None:
+                actual.setdefault(clave, None)
+            elif actual.get(clave) is None:
+                actual[clave] = valor
+            else:
+                actual[clave] += valor
+
+    def guardar(self):
+        self.cerrar_tramo()
+        os.makedirs(os.path.dirname(self.archivo), exist_ok=True)
+        fecha = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with open(self.archivo, 'a', encoding='utf-8') as f:
+            for nombre, medida in self.etapas.items():
+                registro = {'corrida': self.corrida, 'fecha': fecha, 'script': self.script, 'etapa': nombre}
+                registro.update({k: round(v, 4) if isinstance(v, float) else v for k, v in medida.items()})
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+        if self.perfil:
+            carpeta = os.path.join(os.path.dirname(self.archivo), "perfiles")
+            os.makedirs(carpeta, exist_ok=True)
+            for nombre, perfilador in self._perfiles.items():
+                perfilador.guardar(os.path.join(carpeta, f"{self.corrida}_{nombre}"))
+
+    def imprimir(self):
+        print(f"⏱️ Reporte de etapas ({self.script}):")
+        for nombre, m in self.etapas.items():
+            delta = m.get('delta_rss_mb')
+            ram = f" | RAM {delta:+.0f} MB" if delta is not None else ""
+            print(f"   {nombre:<22} {m['tiempo_s']:7.2f}s (CPU {m['cpu_s']:.2f}s){ram}")
+
+
+class _SinReporte:
+    # Mismo "contrato" que Reporte pero sin medir nada (valor por defecto en las funciones)
+    @contextmanager
+    def etapa(self, nombre, filas_entrada=None):
+        yield {}
+
+
+SIN_REPORTE = _SinReporte()
@@ -0,0 +1,94 @@
+# %%
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from censo_carga import (TAMANO_BLOQUE, acumular, compresion_de, es_ruta, grupos_de_filas,
+                         leer_censo_por_bloques, leer_grupos_de_filas, preparar_parquet)
+from censo_agregados import agregar
+
+# ==========================================
+# --- PROCESAMIENTO EN PARALELO (VARIOS NÚCLEOS) ---
+# ==========================================
+# Todos los resúmenes son sumas/conteos, así que el censo se puede partir en pedazos,
+# agregar cada pedazo en un proceso distinto y sumar las tablas base al final.
+# El resultado es EXACTAMENTE el mismo que la corrida en serie.
+#   - Si existe el Parquet: un pedazo = varios row groups (~las mismas filas por pedazo).
+#   - Si solo hay CSV: un pedazo = un rango de bytes cortado en un salto de línea.
+
+
+def rangos_de_bytes(file_path, n_rangos):
+    # Parte el archivo en n_rangos tramos de tamaño parecido, cada uno empezando
+    # justo después de un salto de línea (nunca se corta una fila a la mitad)
+    tamano = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        f.readline()                      # Encabezado
+        inicio_datos = f.tell()
+        cortes = [inicio_datos]
+        for i in range(1, n_rangos):
+            f.seek(max(inicio_datos, tamano * i // n_rangos))
+            f.readline()
+            cortes.append(max(f.tell(), cortes[-1]))
+    cortes.append(tamano)
+    return [(a, b) for a, b in zip(cortes[:-1], cortes[1:]) if b > a]
+
+
+def _agregar_rango(file_path, inicio, fin, chunksize, agregador=agregar, columnas=None):
+    # Misma lectura que en serie (incluido el modo tolerante si hay celdas sucias)
+    return agregador(leer_censo_por_bloques(file_path, columnas, chunksize, tramo=(inicio, fin)))
+
+
+def _agregar_grupos(parquet_dir, piezas, chunksize, agregador=agregar, columnas=None):
+    return agregador(leer_grupos_de_filas(parquet_dir, piezas, columnas, chunksize))
+
+
+def repartir_grupos(grupos, n_tareas):
+    # Junta row groups seguidos en n_tareas tareas de ~las mismas filas. Por depto no
+    # alcanza: San Salvador tiene ~30% de las filas y limitaría todo a ~3x.
+    # Cada tarea: [(archivo, [ids])]
+    objetivo = max(sum(filas for _, _, filas in grupos) / max(n_tareas, 1), 1)
+    tareas, actual, filas_actual = [], [], 0
+    for ruta, id_grupo, filas in grupos:
+        if actual and actual[-1][0] == ruta:
+            actual[-1][1].append(id_grupo)
+        else:
+            actual.append((ruta, [id_grupo]))
+        filas_actual += filas
+        if filas_actual >= objetivo:
+            tareas.append(actual)
+            actual, filas_actual = [], 0
+    if actual:
+        # Un resto chico va con la última tarea (no vale la pena otro proceso)
+        if tareas and filas_actual < objetivo / 2:
+            tareas[-1].extend(actual)
+        else:
+            tareas.append(actual)
+    return tareas
+
+
+def agregar_en_paralelo(file_path, parquet_dir=None, workers=None, chunksize=TAMANO_BLOQUE, al_avanzar=None,
+                        agregador=agregar, combinar=acumular, columnas=None):
+    # Misma salida que agregador(abrir_censo(...)): (tabla base, total de registros).
+    # agregador/combinar permiten otras estructuras sumables (ej. construir_cubo/combinar_cubos);
+    # deben ser funciones de módulo para poder mandarlas a los procesos hijos.
+    workers = workers or os.cpu_count()
+    if parquet_dir and es_ruta(file_path) and preparar_parquet(file_path, parquet_dir, columnas, chunksize):
+        tareas = [(_agregar_grupos, parquet_dir, piezas, chunksize, agregador, columnas)
+                  for piezas in repartir_grupos(grupos_de_filas(parquet_dir), workers * 4)]
+    elif not es_ruta(file_path) or compresion_de(file_path):
+        # Un flujo o un CSV comprimido no se puede partir por bytes: se lee en serie
+        print("⚠️ La entrada es un flujo o está comprimida (sin Parquet): se procesa en serie.")
+        return agregador(leer_censo_por_bloques(file_path, columnas, chunksize), al_avanzar)
+    else:
+        tareas = [(_agregar_rango, file_path, a, b, chunksize, agregador, columnas)
+                  for a, b in rangos_de_bytes(file_path, workers * 4)]
+
+    base, total = None, 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [pool.submit(*tarea) for tarea in tareas]
+        for i, futuro in enumerate(as_completed(futuros), start=1):
+            parcial, n = futuro.result()
+            base = combinar(base, parcial)
+            total += n
+            if al_avanzar:
+                al_avanzar(i, total)
+    return base, total
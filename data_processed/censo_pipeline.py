@@ -0,0 +1,219 @@
+# %%
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# ==========================================
+# --- PIPELINE INCREMENTAL (SOLO LO QUE CAMBIÓ) ---
+# ==========================================
+# Cada etapa declara sus entradas y salidas. Guardamos una "huella" (hash) de cada
+# archivo y solo se vuelve a correr una etapa si cambió alguna de sus entradas
+# (datos, el propio script o los módulos que usa) o si falta alguna salida.
+# Ej: si solo cambia resumen_tic_completo.csv, solo se re-dibuja dashboard_digital.png.
+#
+# Uso:  python censo_pipeline.py            (incremental)
+#       python censo_pipeline.py --forzar   (corre todo)
+#       python censo_pipeline.py --revisar  (solo dice qué está desactualizado)
+
+# --- CONFIGURACIÓN (mismas rutas que los scripts 01-04) ---
+BASE_DIR = r"C:\Users\wyane\OneDrive\Escritorio\WebPage"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CENSO_CSV = r"Z:\CENSO_2024\Bases-Finales-CPV2024SV-CSV\BasedeDatosdePoblacionCPV2024SV.csv"
+VIVIENDA_CSV = r"Z:\CENSO_2024\Bases-Finales-CPV2024SV-CSV\BasedeDatosdeViviendaCPV2024SV.csv"
+DATA_DIR = os.path.join(BASE_DIR, "data_processed", "CENSO")
+IMG_DIR = os.path.join(BASE_DIR, "images", "CENSO2024")
+
+# Estado de la última corrida (huellas por etapa)
+ARCHIVO_ESTADO = os.path.join(SCRIPTS_DIR, ".estado_pipeline.json")
+
+# Archivos más grandes que esto no se leen completos: tamaño + fecha + muestras
+LIMITE_HASH_COMPLETO = 64 * 1024 * 1024
+TAMANO_MUESTRA = 1024 * 1024
+
+
+def _script(nombre):
+    return os.path.join(SCRIPTS_DIR, nombre)
+
+
+def _csv(nombre):
+    return os.path.join(DATA_DIR, nombre)
+
+
+MODULOS_CENSO = [_script(m) for m in ('censo_carga.py', 'censo_agregados.py',
+                                      'censo_recodificacion.py', 'censo_paralelo.py', 'censo_cubo.py',
+                                      'censo_territorio.py', 'censo_diccionario.py', 'censo_estadistica.py',
+                                      'censo_vivienda.py', 'censo_instrumentacion.py')]
+
+# Variantes extra de 05_mapa_municipios.py (sus VARIABLES menos la primera; no se importa el
+# script porque dibuja al importarlo)
+VARIANTES_MAPA = ['Pct_Smartphone', 'Pct_Ingles']
+
+# Etapa -> script, entradas (además del script) y salidas. El orden es el del DAG.
+ETAPAS = {
+    'procesar': {
+        'script': _script('01_procesar_datos.py'),
+        'entradas': [CENSO_CSV] + MODULOS_CENSO,
+        # Sin la base de viviendas se omite resumen_vivienda.csv, pero la etapa corre igual
+        'entradas_opcionales': [VIVIENDA_CSV],
+        'salidas': [_csv(f) for f in ('resumen_deptos.csv', 'resumen_edades.csv', 'resumen_educacion.csv',
+                                      'resumen_ingles.csv', 'resumen_tic_completo.csv', 'resumen_intervalos.csv')],
+        # Solo si el CSV trae MUNIC / ID_VIV y existe la base de viviendas
+        'salidas_opcionales': [_csv(f) for f in ('resumen_municipios.csv', 'resumen_intervalos_municipios.csv',
+                                                 'resumen_vivienda.csv')],
+    },
+    'dashboard_poblacion': {
+        'script': _script('02_dashboard.py'),
+        'entradas': [_csv('resumen_deptos.csv'), _csv('resumen_edades.csv'), _script('censo_geometria.py'),
+                     _script('censo_graficos.py')],
+        'salidas': [os.path.join(IMG_DIR, 'dashboard_poblacion.png')],
+    },
+    'dashboard_educacion': {
+        'script': _script('03_dashboard_educacion.py'),
+        'entradas': [_csv('resumen_educacion.csv'), _csv('resumen_ingles.csv'), _script('censo_graficos.py')],
+        'salidas': [os.path.join(IMG_DIR, 'dashboard_educacion.png')],
+    },
+    'dashboard_digital': {
+        'script': _script('04_dashboard_digital.py'),
+        'entradas': [_csv('resumen_tic_completo.csv'), _script('censo_graficos.py')],
+        'salidas': [os.path.join(IMG_DIR, 'dashboard_digital.png')],
+    },
+    # Solo si el CSV trae el municipio (si falta resumen_municipios.csv se omite)
+    'mapa_municipios': {
+        'script': _script('05_mapa_municipios.py'),
+        'entradas': [_csv('resumen_municipios.csv'), _script('censo_geometria.py'), _script('censo_graficos.py')],
+        # La tabla código -> nombre la genera el script desde GADM si falta; si se corrige a mano, se rehace
+        'entradas_opcionales': [os.path.join(SCRIPTS_DIR, 'geo', 'municipios_censo.csv')],
+        # Un PNG por variable de VARIABLES en 05_mapa_municipios.py (la primera sin sufijo)
+        'salidas': [os.path.join(IMG_DIR, 'mapa_municipios.png')]
+                   + [os.path.join(IMG_DIR, f'mapa_municipios_{v.lower()}.png') for v in VARIANTES_MAPA],
+    },
+    # JSON/TopoJSON para los gráficos interactivos de projects.qmd (mismas rutas que censo_web.py)
+    'web': {
+        'script': _script('censo_web.py'),
+        'entradas': [_csv(f) for f in ('resumen_deptos.csv', 'resumen_edades.csv', 'resumen_educacion.csv',
+                                       'resumen_ingles.csv', 'resumen_tic_completo.csv')]
+                    + [_script('censo_geometria.py'), _script('censo_cubo.py')],
+        # Sin el cubo (01_procesar_datos.py --cubo) solo faltan los cruces: no se omite la etapa
+        'entradas_opcionales': [os.path.join(SCRIPTS_DIR, 'CENSO_cubo', 'cubo_censo.npz')],
+        'salidas': [os.path.join(os.path.dirname(SCRIPTS_DIR), 'data', 'CENSO2024', 'manifiesto.json')],
+    },
+}
+
+
+def huella(ruta):
+    # Hash del contenido; para archivos gigantes: tamaño + mtime + inicio/medio/final
+    if not os.path.exists(ruta):
+        return None
+    info = os.stat(ruta)
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        if info.st_size <= LIMITE_HASH_COMPLETO:
+            for bloque in iter(lambda: f.read(TAMANO_MUESTRA), b''):
+                h.update(bloque)
+        else:
+            h.update(f"{info.st_size}:{info.st_mtime_ns}".encode())
+            for pos in (0, info.st_size // 2, info.st_size - TAMANO_MUESTRA):
+                f.seek(max(pos, 0))
+                h.update(f.read(TAMANO_MUESTRA))
+    return h.hexdigest()
+
+
+def huellas_etapa(etapa):
+    # Las entradas opcionales también cuentan: si aparecen o cambian, la etapa se vuelve a correr
+    archivos = [etapa['script']] + etapa['entradas'] + etapa.get('entradas_opcionales', [])
+    return {ruta: huella(ruta) for ruta in archivos}
+
+
+def huellas_salidas(etapa):
+    return {ruta: huella(ruta) for ruta in etapa['salidas'] + etapa.get('salidas_opcionales', [])}
+
+
+def leer_estado():
+    if not os.path.exists(ARCHIVO_ESTADO):
+        return {}
+    with open(ARCHIVO_ESTADO, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_estado(estado):
+    with open(ARCHIVO_ESTADO, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, indent=2)
+
+
+def motivo_para_correr(nombre, etapa, estado, entradas):
+    # Devuelve por qué hay que correr la etapa (o None si está al día)
+    previo = estado.get(nombre)
+    if previo is None:
+        return "nunca se ha corrido"
+    salidas = huellas_salidas(etapa)
+    previas = previo.get('salidas', {})
+    # Una salida opcional solo "falta" si la corrida anterior sí la generó
+    opcionales = set(etapa.get('salidas_opcionales', []))
+    faltantes = [os.path.basename(r) for r, h in salidas.items()
+                 if h is None and (r not in opcionales or previas.get(r) is not None)]
+    if faltantes:
+        return f"faltan salidas: {', '.join(faltantes)}"
+    if salidas != previas:
+        return "las salidas se modificaron a mano"
+    cambiadas = [os.path.basename(r) for r, h in entradas.items()
+                 if h is not None and h != previo['entradas'].get(r)]
+    if cambiadas:
+        return f"cambió: {', '.join(cambiadas)}"
+    return None
+
+
+def correr_etapa(etapa, argumentos=()):
+    # Backend "Agg": los plt.show() de los dashboards no bloquean ni abren ventanas
+    entorno = dict(os.environ, MPLBACKEND='Agg')
+    comando = [sys.executable, etapa['script'], *argumentos]
+    subprocess.run(comando, cwd=SCRIPTS_DIR, env=entorno, check=True)
+
+
+def correr_pipeline(forzar=False, solo=None, argumentos_procesar=(), revisar=False):
+    # revisar=True: solo dice qué etapas se correrían (no corre nada ni toca el estado)
+    estado = leer_estado()
+    inicio = time.perf_counter()
+    for nombre, etapa in ETAPAS.items():
+        if solo and nombre not in solo:
+            continue
+        entradas = huellas_etapa(etapa)
+        opcionales = set(etapa.get('entradas_opcionales', []))
+        faltan = [os.path.basename(r) for r, h in entradas.items() if h is None and r not in opcionales]
+        motivo = "--forzar" if forzar else motivo_para_correr(nombre, etapa, estado, entradas)
+
+        if motivo is None:
+            print(f"⏭️  {nombre}: al día, se omite.")
+            continue
+        if faltan:
+            # Ej: el Z: no está conectado; si ya hay salidas, seguimos con ellas
+            print(f"⚠️ {nombre}: no se encuentra {', '.join(faltan)}; se omite.")
+            continue
+
+        if revisar:
+            print(f"🔎 {nombre}: se correría ({motivo})")
+            continue
+        print(f"▶️  {nombre}: {motivo}")
+        t0 = time.perf_counter()
+        correr_etapa(etapa, argumentos_procesar if nombre == 'procesar' else ())
+        estado[nombre] = {
+            'entradas': huellas_etapa(etapa),
+            'salidas': huellas_salidas(etapa),
+        }
+        guardar_estado(estado)
+        print(f"✅ {nombre}: listo en {time.perf_counter() - t0:.1f}s")
+    if not revisar:
+        print(f"🚀 Pipeline terminado en {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Corre solo las etapas del censo cuyas entradas cambiaron")
+    parser.add_argument("--forzar", action="store_true", help="Corre todas las etapas aunque estén al día")
+    parser.add_argument("--solo", nargs="+", choices=list(ETAPAS), help="Limita a estas etapas")
+    parser.add_argument("--workers", type=int, default=1, help="Se pasa a 01_procesar_datos.py")
+    parser.add_argument("--revisar", action="store_true", help="Solo muestra qué etapas se correrían")
+    args, _ = parser.parse_known_args()
+    correr_pipeline(args.forzar, args.solo, ('--workers', str(args.workers)), args.revisar)
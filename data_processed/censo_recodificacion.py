@@ -0,0 +1,103 @@
+# %%
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# --- RECODIFICACIÓN VECTORIZADA (TABLAS DE RANGOS) ---
+# ==========================================
+# En vez de funciones if/elif aplicadas fila por fila (Series.apply), cada recodificación
+# es una TABLA declarativa: (desde, hasta, etiqueta), ambos extremos incluidos.
+# La misma tabla se evalúa con np.select (valores sueltos) o con un arreglo de búsqueda
+# (códigos enteros -> categoría en O(1) por fila).
+
+SIN_LIMITE = np.inf
+
+# P10_1_GRADO_APROBADO (según el diccionario del censo)
+NIVEL_EDUCATIVO = [
+    (0, 0, "Ninguno"),              # Código 0
+    (1, 3, "Inicial"),              # Códigos 1, 2, 3 (Parvularia)
+    (4, 9, "Especial"),             # Códigos 4 al 9 (Educación Especial)
+    (11, 19, "Básica"),             # Códigos 11 al 19 (1° a 9° Grado)
+    (21, 29, "Media"),              # Códigos 21 al 24 (Bachillerato)
+    (30, SIN_LIMITE, "Superior"),   # Series 30 (Técnico), 40 (Univ), 50 (Maestría), 60 (Doctorado)
+]
+
+# P02_2_SEXO: Asumiendo 1=Hombre, 2=Mujer (Verifica tu diccionario)
+SEXO = [
+    (1, 1, "Hombre"),
+    (2, 2, "Mujer"),
+]
+
+# P02_3_EDAD en grupos amplios de 15 años (para cruces y filtros por edad)
+GRUPOS_EDAD = [
+    (0, 14, "0-14"),
+    (15, 29, "15-29"),
+    (30, 44, "30-44"),
+    (45, 59, "45-59"),
+    (60, SIN_LIMITE, "60+"),
+]
+
+
+def etiquetas(tabla, por_defecto="Ignorado"):
+    # Orden oficial de las categorías (el "por defecto" siempre al final)
+    return [e for _, _, e in tabla] + [por_defecto]
+
+
+def _enteros(valores):
+    # Códigos como int64 de NumPy; vacíos y no numéricos -> -1.
+    # Si ya vienen como enteros (Int8/Int16 del cargador) no se copia nada extra.
+    v = pd.Series(valores)
+    if pd.api.types.is_integer_dtype(v.dtype):
+        return v.to_numpy(dtype='int64', na_value=-1)
+    v = np.trunc(pd.to_numeric(v, errors='coerce').to_numpy(dtype='float64', na_value=np.nan))
+    return np.where(np.isnan(v), -1, v).astype('int64')
+
+
+def recodificar(valores, tabla, por_defecto="Ignorado"):
+    # Versión general: sirve con cualquier número (vacíos/no numéricos -> por_defecto).
+    # np.select se evalúa solo sobre los valores ÚNICOS y luego se expande a todas las filas.
+    unicos_idx, unicos = pd.factorize(pd.to_numeric(pd.Series(valores), errors='coerce'))
+    v = np.trunc(np.asarray(unicos, dtype='float64'))     # igual que int(valor): 3.5 -> 3
+    condiciones = [(v >= desde) & (v <= hasta) for desde, hasta, _ in tabla]
+    por_unico = np.select(condiciones, [e for _, _, e in tabla], default=por_defecto)
+    por_unico = np.append(por_unico, por_defecto).astype(object)   # posición -1 = vacío
+    return por_unico[unicos_idx]
+
+
+def crear_busqueda(tabla, maximo):
+    # Arreglo índice=código -> posición de la etiqueta (len(tabla) = por_defecto).
+    # Casilla maximo+1 = "mayor que maximo" (solo la llena un rango SIN_LIMITE);
+    # casilla maximo+2 = vacíos y negativos.
+    if any(np.isfinite(hasta) and hasta > maximo for _, hasta, _ in tabla):
+        raise ValueError(f"maximo={maximo} es menor que algún límite de la tabla")
+    busqueda = np.full(maximo + 3, len(tabla), dtype='int8')
+    for i, (desde, hasta, _) in enumerate(tabla):
+        busqueda[int(max(desde, 0)):int(min(hasta, maximo + 1)) + 1] = i
+    return busqueda
+
+
+def _posiciones(valores, tabla, maximo):
+    # Posición en la tabla de cada valor (len(tabla) = no está en la tabla)
+    codigos = _enteros(valores)
+    # np.where (no asignación en el lugar): _enteros puede devolver una vista de solo lectura
+    codigos = np.where(codigos > maximo, maximo + 1, np.where(codigos < 0, maximo + 2, codigos))
+    return crear_busqueda(tabla, maximo)[codigos]
+
+
+def recodificar_codigos(valores, tabla, por_defecto="Ignorado", maximo=255):
+    # Versión rápida para códigos enteros (>= 0): una búsqueda en arreglo por fila
+    # y resultado Categorical (1 byte por fila en vez de un string)
+    posiciones = _posiciones(valores, tabla, maximo)
+    if por_defecto is None:
+        # Sin categoría "por defecto": lo que no está en la tabla queda vacío (NaN)
+        posiciones = np.where(posiciones == len(tabla), -1, posiciones)
+        return pd.Categorical.from_codes(posiciones, categories=[e for _, _, e in tabla])
+    return pd.Categorical.from_codes(posiciones, categories=etiquetas(tabla, por_defecto))
+
+
+def recodificar_a_codigos(valores, tabla, maximo=255, dtype='Int16'):
+    # Igual, pero la "etiqueta" de cada rango es OTRO código entero (ej. códigos del censo
+    # 2007 -> códigos de 2024). Varios rangos pueden ir al mismo código; fuera de la tabla = vacío.
+    nuevos = pd.array([c for _, _, c in tabla] + [None], dtype=dtype)
+    return nuevos[_posiciones(valores, tabla, maximo)]
+
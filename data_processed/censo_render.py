@@ -0,0 +1,235 @@
+# %%
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import runpy
+import secrets
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+# ==========================================
+# --- RENDER DE DASHBOARDS EN PARALELO (SIN VENTANAS) ---
+# ==========================================
+# Corre los scripts 02-05 al mismo tiempo, cada uno en su proceso, con el backend
+# "Agg" (sin ventanas: plt.show() no bloquea, sirve en CI). Cada proceso importa
+# pandas/matplotlib/seaborn/geopandas UNA vez al arrancar, y además del PNG puede
+# escribir WebP/AVIF y miniaturas livianas para la web de Quarto.
+# El tiempo total queda cerca del dashboard más lento (el mapa).
+#
+# Uso:  python censo_render.py                       (todos los dashboards, solo PNG)
+#       python censo_render.py --formatos webp avif --miniaturas
+#       python censo_render.py --servidor              (worker "en caliente", ver abajo)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DASHBOARDS = {
+    'poblacion': os.path.join(SCRIPTS_DIR, '02_dashboard.py'),
+    'educacion': os.path.join(SCRIPTS_DIR, '03_dashboard_educacion.py'),
+    'digital': os.path.join(SCRIPTS_DIR, '04_dashboard_digital.py'),
+    'municipios': os.path.join(SCRIPTS_DIR, '05_mapa_municipios.py'),
+}
+
+DPI_MINIATURA = 72
+
+# Dirección y clave del worker en caliente (la clave es aleatoria en cada arranque y
+# solo la puede leer el usuario dueño del archivo)
+ARCHIVO_WORKER = os.path.join(SCRIPTS_DIR, ".worker_render.json")
+
+
+def _iniciar_worker():
+    # Se ejecuta una vez por proceso: backend sin ventanas + imports pesados "en caliente"
+    # (import_module: solo se cargan, no se usan aquí; así pyflakes no los marca sin usar)
+    import matplotlib
+    matplotlib.use('Agg')
+    for modulo in ('matplotlib.pyplot', 'pandas', 'seaborn'):
+        importlib.import_module(modulo)
+    try:
+        importlib.import_module('geopandas')
+    except ImportError:
+        pass
+    # plt.show() con Agg solo avisa que "no es interactivo"
+    warnings.filterwarnings('ignore', message='.*non-interactive.*')
+
+
+def _exportar_extras(fig, save_path, formatos, miniaturas):
+    from PIL import Image
+
+    base, _ = os.path.splitext(save_path)
+    generados = []
+    for formato in formatos:
+        destino = f"{base}.{formato}"
+        try:
+            # Se convierte el PNG ya guardado (mismos píxeles, sin volver a dibujar)
+            with Image.open(save_path) as img:
+                img.save(destino, quality=85)
+            generados.append(destino)
+        except (KeyError, OSError) as e:
+            print(f"⚠️ No se pudo generar {formato.upper()} ({e}); ¿Pillow sin soporte?")
+    if miniaturas:
+        destino = f"{base}_mini.png"
+        fig.savefig(destino, dpi=DPI_MINIATURA, bbox_inches='tight')
+        generados.append(destino)
+    return generados
+
+
+def renderizar(nombre, formatos=(), miniaturas=False):
+    # Corre UN dashboard (su script tal cual) y exporta los formatos extra
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    # Estilo limpio en cada corrida: sns.set_style() de un script no contamina al siguiente
+    matplotlib.rcParams.update(matplotlib.rcParamsDefault)
+    matplotlib.use('Agg')
+
+    inicio = time.perf_counter()
+    try:
+        variables = runpy.run_path(DASHBOARDS[nombre], run_name='__main__')
+        save_path = variables['save_path']
+        generados = [save_path] + _exportar_extras(variables['fig'], save_path, formatos, miniaturas)
+    except SystemExit:
+        # Los scripts hacen exit() si no encuentran sus CSV (ya imprimieron el error)
+        return nombre, [], time.perf_counter() - inicio
+    finally:
+        # También si el script falla: el worker en caliente no debe ir juntando figuras abiertas
+        plt.close('all')
+    return nombre, generados, time.perf_counter() - inicio
+
+
+def renderizar_todos(nombres=None, formatos=(), miniaturas=False, workers=None):
+    nombres = list(nombres or DASHBOARDS)
+    workers = workers or len(nombres)
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) as pool:
+        futuros = [pool.submit(renderizar, n, tuple(formatos), miniaturas) for n in nombres]
+        resultados = [f.result() for f in futuros]
+    for nombre, generados, segundos in resultados:
+        estado = "✅" if generados else "❌"
+        print(f"{estado} {nombre}: {segundos:.1f}s -> {', '.join(os.path.basename(g) for g in generados)}")
+    print(f"🚀 Render total: {time.perf_counter() - inicio:.1f}s")
+    return resultados
+
+
+# ==========================================
+# --- WORKER EN CALIENTE (PARA ITERAR CON EL ESTILO) ---
+# ==========================================
+# Un proceso que se queda vivo con pandas/matplotlib/geopandas ya importados, los
+# resumen_*.csv leídos y la geometría simplificada en memoria. Cada pedido solo vuelve
+# a correr el script del dashboard (dibujo + guardado), sin pagar imports ni lecturas.
+# Los CSV se releen solos si cambian en el disco (se compara la fecha de modificación).
+#   Terminal 1:  python censo.py servidor
+#   Terminal 2:  python censo.py dashboard digital     (usa el worker si está corriendo)
+
+def _cachear_lecturas():
+    # pd.read_csv(ruta) y cargar_mapa(...) con memoria; cada script recibe una copia
+    import pandas as pd
+    import censo_geometria
+
+    leer_csv, cargar_mapa = pd.read_csv, censo_geometria.cargar_mapa
+    cache = {}
+
+    def read_csv(ruta, *args, **kwargs):
+        if args or kwargs or not isinstance(ruta, str):
+            return leer_csv(ruta, *args, **kwargs)
+        llave = ('csv', os.path.abspath(ruta), os.stat(ruta).st_mtime_ns)
+        if llave not in cache:
+            cache[llave] = leer_csv(ruta)
+        return cache[llave].copy()
+
+    def cargar_mapa_cacheado(nivel=1, tolerancia=None):
+        llave = ('mapa', nivel, tolerancia)
+        if llave not in cache:
+            cache[llave] = cargar_mapa(nivel, tolerancia)
+        return cache[llave].copy()
+
+    pd.read_csv = read_csv
+    censo_geometria.cargar_mapa = cargar_mapa_cacheado
+
+
+def _atender(pedido, formatos=(), miniaturas=False):
+    # Corre un dashboard y devuelve también lo que imprimió (para mostrarlo en el cliente)
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        try:
+            resultado = renderizar(pedido, formatos, miniaturas)
+        except Exception as e:
+            resultado = (pedido, [], 0.0)
+            print(f"❌ {type(e).__name__}: {e}")
+    return resultado + (salida.getvalue(),)
+
+
+def servir():
+    from multiprocessing.connection import Listener
+
+    _iniciar_worker()
+    try:
+        _cachear_lecturas()
+    except ImportError:
+        pass
+    clave = secrets.token_bytes(32)
+    with Listener(('127.0.0.1', 0), authkey=clave) as escucha:
+        with open(os.open(ARCHIVO_WORKER, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            json.dump({'puerto': escucha.address[1], 'clave': clave.hex(), 'pid': os.getpid()}, f)
+        print(f"🔥 Worker listo (puerto {escucha.address[1]}). Ctrl+C o 'censo.py servidor --detener' para salir.")
+        try:
+            while True:
+                with escucha.accept() as conexion:
+                    nombre, formatos, miniaturas = conexion.recv()
+                    if nombre is None:
+                        conexion.send(True)
+                        break
+                    if nombre not in DASHBOARDS:
+                        conexion.send((nombre, [], 0.0, f"❌ Dashboard desconocido: {nombre}\n"))
+                        continue
+                    resultado = _atender(nombre, formatos, miniaturas)
+                    print(f"{'✅' if resultado[1] else '❌'} {nombre}: {resultado[2]:.2f}s")
+                    conexion.send(resultado)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(ARCHIVO_WORKER):
+                os.remove(ARCHIVO_WORKER)
+    print("👋 Worker detenido.")
+
+
+def pedir_al_worker(nombre, formatos=(), miniaturas=False):
+    # Devuelve (nombre, generados, segundos, salida) o None si no hay worker corriendo.
+    # nombre=None detiene el worker.
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Client
+
+    if not os.path.exists(ARCHIVO_WORKER):
+        return None
+    with open(ARCHIVO_WORKER, encoding='utf-8') as f:
+        datos = json.load(f)
+    try:
+        with Client(('127.0.0.1', datos['puerto']), authkey=bytes.fromhex(datos['clave'])) as conexion:
+            conexion.send((nombre, tuple(formatos), miniaturas))
+            return conexion.recv()
+    except (ConnectionRefusedError, ConnectionResetError, EOFError, AuthenticationError):
+        # Archivo viejo de un worker que ya no existe (o el puerto ahora es de otro proceso)
+        if os.path.exists(ARCHIVO_WORKER):
+            os.remove(ARCHIVO_WORKER)
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Renderiza los dashboards del censo en paralelo (sin ventanas)")
+    # Sin choices: con nargs="*" argparse valida la lista vacía por defecto y falla
+    parser.add_argument("dashboards", nargs="*", help=f"{', '.join(DASHBOARDS)} (por defecto, todos)")
+    parser.add_argument("--formatos", nargs="*", default=[], choices=['webp', 'avif'],
+                        help="Formatos extra además del PNG")
+    parser.add_argument("--miniaturas", action="store_true", help=f"PNG extra a {DPI_MINIATURA} dpi")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--servidor", action="store_true", help="Deja un worker en caliente esperando pedidos")
+    args = parser.parse_args()
+    desconocidos = [n for n in args.dashboards if n not in DASHBOARDS]
+    if desconocidos:
+        parser.error(f"dashboard desconocido: {', '.join(desconocidos)} (opciones: {', '.join(DASHBOARDS)})")
+    if args.servidor:
+        servir()
+    else:
+        renderizar_todos(args.dashboards, args.formatos, args.miniaturas, args.workers)
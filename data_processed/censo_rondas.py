@@ -0,0 +1,243 @@
+# %%
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from censo_carga import (DTYPES_CENSO, TAMANO_BLOQUE, COLUMNAS_CENSO, huella_archivo, abrir_censo,
+                         leer_censo_por_bloques)
+from censo_agregados import agregar, construir_resumenes, variables_tic, CLAVES_BASE
+from censo_diccionario import etiquetar
+from censo_recodificacion import recodificar_a_codigos
+
+# ==========================================
+# --- VARIAS RONDAS CENSALES (2007, 2024, ...) CON AGREGADOS EN CACHÉ ---
+# ==========================================
+# Todo el flujo asume el CPV2024. Para comparar con el censo de 2007 (y los que vengan)
+# cada ronda se procesa UNA vez a la MISMA tabla base de siempre (Depto x Edad x Grado,
+# ver censo_agregados.py) y se guarda en CENSO_rondas/<ronda>/. Antes de agregar, cada
+# bloque se "armoniza" al esquema de 2024: se renombran columnas y se recodifican los
+# códigos con tablas de rangos (censo_recodificacion). Las comparaciones (ej. cambio
+# del % con internet por depto) salen de las tablas en caché: no se vuelve a leer ningún
+# CSV de microdatos, salvo que cambie el archivo o su armonización.
+#
+# Uso:  python censo_rondas.py                          (todas las rondas, desde la caché)
+#       python censo_rondas.py --rondas 2007 2024 --forzar
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPTS_DIR, "CENSO_rondas")
+# Donde 01_procesar_datos.py deja los resumen_*.csv
+DATA_DIR = os.path.join(SCRIPTS_DIR, "CENSO")
+
+# Ronda -> archivo, columnas (nombre en el CSV de esa ronda -> nombre armonizado, el de
+# 2024; vacío = mismos nombres) y recodificaciones {nombre armonizado: (tabla, máximo)}.
+# 'parquet' (opcional): almacén Parquet de ese CSV (ver censo_carga.abrir_censo); solo para
+# rondas con los nombres de 2024, que son los que conoce el esquema del Parquet.
+# Las variables que una ronda no trae quedan vacías y sus indicadores salen como NaN.
+# IMPORTANTE: nombres y códigos de 2007 según el diccionario de la base del VI Censo de
+# Población 2007; revisa con "import pandas as pd.py" antes de confiar en la comparación.
+RONDAS = {
+    '2007': {
+        'archivo': r"Z:\CENSO_2007\BasedeDatosdePoblacionCPV2007SV.csv",
+        'columnas': {
+            'DEPTO': 'DEPTO',
+            'NPERSONA': 'COD_PER',
+            'S06P02': 'P02_2_SEXO',
+            'S06P03A': 'P02_3_EDAD',
+            'S06P16': 'P10_1_GRADO_APROBADO',
+        },
+        'recodificar': {
+            # Años aprobados en 2007 -> códigos de grado de 2024 (1°-9° = 11-19, bachillerato = 21-23)
+            'P10_1_GRADO_APROBADO': ([(0, 0, 0)] + [(g, g, 10 + g) for g in range(1, 10)]
+                                     + [(g, g, 11 + g) for g in range(10, 13)] + [(13, 30, 40)], 99),
+        },
+    },
+    '2024': {
+        'archivo': r"Z:\CENSO_2024\Bases-Finales-CPV2024SV-CSV\BasedeDatosdePoblacionCPV2024SV.csv",
+        # El mismo que crea 01_procesar_datos.py: la ronda 2024 no vuelve a leer el CSV
+        'parquet': os.path.join(SCRIPTS_DIR, "CENSO_parquet"),
+        'columnas': {},
+        'recodificar': {},
+    },
+}
+
+# Niveles educativos que las tablas de 'recodificar' llevan a los códigos de 2024 en TODAS
+# las rondas (2007 no distingue Inicial ni Especial: esas personas quedarían como Ignorado)
+NIVELES_COMPARABLES = ['Ninguno', 'Básica', 'Media', 'Superior']
+
+# Indicador -> (resumen de donde sale, columna, variables armonizadas que necesita)
+INDICADORES_COMPARABLES = {
+    'Poblacion': ('resumen_deptos.csv', 'Poblacion', ['COD_PER']),
+    'Mujeres': ('resumen_deptos.csv', 'Mujeres', ['COD_PER', 'P02_2_SEXO']),
+    'Pct_Ingles': ('resumen_ingles.csv', 'Pct_Ingles', ['P12_3_A_ENG']),
+    **{f'Pct_{nombre}': ('resumen_tic_completo.csv', f'Pct_{nombre}', [columna])
+       for columna, nombre in variables_tic.items()},
+    **{f'Pct_Educ_{nivel}': ('educacion_comparable', f'Pct_Educ_{nivel}', ['P10_1_GRADO_APROBADO'])
+       for nivel in NIVELES_COMPARABLES},
+}
+
+
+# --- LECTURA ARMONIZADA ---
+def _columnas_ronda(ronda):
+    # {nombre en el CSV: nombre armonizado} de las variables que usa la tabla base
+    columnas = RONDAS[ronda]['columnas'] or {c: c for c in COLUMNAS_CENSO}
+    return {original: armonizado for original, armonizado in columnas.items() if armonizado in COLUMNAS_CENSO}
+
+
+def armonizar_bloque(armonizado, ronda):
+    # Bloque ya con los nombres de 2024 (ver leer_ronda) -> columnas y códigos de 2024
+    for columna, (tabla, maximo) in RONDAS[ronda]['recodificar'].items():
+        armonizado[columna] = recodificar_a_codigos(armonizado[columna], tabla, maximo, DTYPES_CENSO[columna])
+    for columna in COLUMNAS_CENSO:
+        if columna not in armonizado:
+            armonizado[columna] = pd.array([pd.NA] * len(armonizado), dtype=DTYPES_CENSO[columna])
+    return armonizado[COLUMNAS_CENSO]
+
+
+def leer_ronda(ronda, chunksize=TAMANO_BLOQUE):
+    # Con la carga de siempre (por bloques, solo las columnas usadas, tolerante a celdas
+    # sucias); los nombres de la ronda se pasan a los de 2024 antes de armonizar
+    config = RONDAS[ronda]
+    columnas = _columnas_ronda(ronda)
+    if config['columnas']:
+        # Nombres de otra ronda: el tipo es el de la columna armonizada, salvo las que se
+        # recodifican, que se leen anchas (sus códigos originales pueden no caber)
+        dtypes = {original: ('Int32' if armonizado in config['recodificar'] else DTYPES_CENSO[armonizado])
+                  for original, armonizado in columnas.items()}
+        bloques = leer_censo_por_bloques(config['archivo'], list(columnas), chunksize, dtypes=dtypes)
+    else:
+        bloques = abrir_censo(config['archivo'], config.get('parquet'), list(columnas), chunksize=chunksize)
+    for bloque in bloques:
+        yield armonizar_bloque(bloque.rename(columns=columnas), ronda)
+
+
+# --- CACHÉ POR RONDA ---
+def _huella_armonizacion(ronda):
+    # Si cambian los nombres o las tablas de recodificación, la caché ya no sirve
+    config = {k: RONDAS[ronda][k] for k in ('columnas', 'recodificar')}
+    config['claves'] = CLAVES_BASE
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _rutas_cache(ronda):
+    carpeta = os.path.join(CACHE_DIR, ronda)
+    return os.path.join(carpeta, "base.csv"), os.path.join(carpeta, "meta.json")
+
+
+def _leer_meta(ronda):
+    _, ruta_meta = _rutas_cache(ronda)
+    if not os.path.exists(ruta_meta):
+        return None
+    with open(ruta_meta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cache_vigente(ronda):
+    # Vigente si la armonización no cambió y el archivo tampoco (si no está accesible,
+    # ej. sin conexión al Z:, se confía en la caché, igual que con el Parquet)
+    meta = _leer_meta(ronda)
+    if meta is None or meta['armonizacion'] != _huella_armonizacion(ronda):
+        return False
+    archivo = RONDAS[ronda]['archivo']
+    return not os.path.exists(archivo) or meta['huella'] == huella_archivo(archivo)
+
+
+def _huella_ronda(ronda):
+    # Sin el CSV (ej. sin conexión al Z:) la ronda 2024 se lee del Parquet: no hay huella
+    archivo = RONDAS[ronda]['archivo']
+    return huella_archivo(archivo) if os.path.exists(archivo) else None
+
+
+def procesar_ronda(ronda, chunksize=TAMANO_BLOQUE):
+    # Una pasada por los microdatos de la ronda -> tabla base en caché
+    print(f"⏳ Procesando la ronda {ronda} ({os.path.basename(RONDAS[ronda]['archivo'])})...")
+    base, total = agregar(leer_ronda(ronda, chunksize))
+    ruta_base, ruta_meta = _rutas_cache(ronda)
+    os.makedirs(os.path.dirname(ruta_base), exist_ok=True)
+    base.reset_index().to_csv(ruta_base, index=False)
+    meta = {
+        'ronda': ronda,
+        'archivo': RONDAS[ronda]['archivo'],
+        'huella': _huella_ronda(ronda),
+        'armonizacion': _huella_armonizacion(ronda),
+        # Variables que de verdad vienen en el CSV de la ronda (las demás quedaron vacías)
+        'variables': sorted(set(_columnas_ronda(ronda).values())),
+        'registros': total,
+    }
+    with open(ruta_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print(f"✅ Ronda {ronda}: {total:,} registros -> {ruta_base}")
+    return base
+
+
+def cargar_base(ronda, forzar=False):
+    # Tabla base de la ronda: de la caché si sirve, si no se procesa (y se guarda)
+    if forzar or not cache_vigente(ronda):
+        return procesar_ronda(ronda)
+    ruta_base, _ = _rutas_cache(ronda)
+    tipos = {c: DTYPES_CENSO[c] for c in CLAVES_BASE}
+    return pd.read_csv(ruta_base, dtype=tipos).set_index(CLAVES_BASE)
+
+
+# --- COMPARACIÓN ENTRE RONDAS ---
+def educacion_comparable(educacion):
+    # resumen_educacion (largo) -> % de cada nivel por depto, sobre las personas de 4+ años
+    # con alguno de los NIVELES_COMPARABLES (así "Ignorado" no mueve la comparación)
+    tabla = educacion[educacion['Nivel_Educativo'].isin(NIVELES_COMPARABLES)]
+    conteos = tabla.pivot_table(index='DEPTO', columns='Nivel_Educativo', values='Conteo', aggfunc='sum')
+    conteos = conteos.reindex(columns=NIVELES_COMPARABLES).fillna(0)
+    porcentajes = conteos.div(conteos.sum(axis=1), axis=0) * 100
+    return porcentajes.add_prefix('Pct_Educ_').rename_axis(columns=None).reset_index()
+
+
+def indicadores_ronda(ronda, forzar=False):
+    # Indicador por depto (formato largo). Los que necesitan variables que la ronda no
+    # trae quedan como NaN en vez de 0.
+    resumenes = construir_resumenes(cargar_base(ronda, forzar))
+    resumenes['educacion_comparable'] = educacion_comparable(resumenes['resumen_educacion.csv'])
+    disponibles = set(_leer_meta(ronda)['variables'])
+    tablas = []
+    for indicador, (archivo, columna, variables) in INDICADORES_COMPARABLES.items():
+        tabla = resumenes[archivo][['DEPTO', columna]].rename(columns={columna: ronda})
+        # Mismo tipo venga de la caché o de una pasada nueva (conteos y % en una sola columna)
+        tabla[ronda] = tabla[ronda].astype('float64')
+        if not set(variables) <= disponibles:
+            tabla[ronda] = float('nan')
+        tablas.append(tabla.assign(Indicador=indicador))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def comparar_rondas(rondas=None, forzar=False):
+    # DEPTO x Indicador con una columna por ronda y el cambio entre la primera y la última
+    # (en puntos porcentuales para los Pct_*)
+    rondas = sorted(rondas or RONDAS)
+    tabla = None
+    for ronda in rondas:
+        parcial = indicadores_ronda(ronda, forzar)
+        tabla = parcial if tabla is None else tabla.merge(parcial, on=['Indicador', 'DEPTO'], how='outer')
+    if len(rondas) > 1:
+        tabla['Cambio'] = tabla[rondas[-1]] - tabla[rondas[0]]
+    tabla.insert(1, 'Nombre_Depto', etiquetar(tabla['DEPTO'], 'DEPTO'))
+    # Indicadores en el orden de INDICADORES_COMPARABLES
+    orden = pd.Categorical(tabla['Indicador'], categories=list(INDICADORES_COMPARABLES))
+    tabla = tabla.assign(_orden=orden).sort_values(['_orden', 'DEPTO']).drop(columns='_orden')
+    columnas = ['DEPTO', 'Nombre_Depto', 'Indicador'] + rondas + (['Cambio'] if len(rondas) > 1 else [])
+    return tabla[columnas].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara rondas censales desde agregados en caché")
+    parser.add_argument("--rondas", nargs="+", choices=list(RONDAS), default=None, help="Por defecto, todas")
+    parser.add_argument("--forzar", action="store_true", help="Vuelve a procesar los microdatos de cada ronda")
+    parser.add_argument("--destino", default=os.path.join(DATA_DIR, "comparacion_rondas.csv"))
+    args = parser.parse_args()
+    try:
+        comparacion = comparar_rondas(args.rondas, args.forzar)
+    except FileNotFoundError as e:
+        print(f"❌ ERROR: no hay caché ni archivo para una de las rondas ({e.filename})")
+        exit()
+    os.makedirs(os.path.dirname(args.destino), exist_ok=True)
+    comparacion.to_csv(args.destino, index=False, encoding='utf-8-sig')
+    print(f"💾 Comparación guardada en {args.destino} ({len(comparacion)} filas)")
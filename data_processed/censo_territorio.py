@@ -0,0 +1,141 @@
+# %%
+import numpy as np
+import pandas as pd
+
+from censo_carga import COLUMNAS_CENSO, acumular, es_si
+from censo_agregados import agregar, variables_tic
+from censo_diccionario import etiquetar
+from censo_instrumentacion import SIN_REPORTE
+
+# ==========================================
+# --- NIVELES TERRITORIALES: DEPTO -> MUNICIPIO ---
+# ==========================================
+# Los resúmenes de siempre son por DEPTO (14 grupos). Para bajar a municipios (unos
+# cientos de grupos) NO usamos groupby con varias claves "nullable" ni apply: cada
+# clave se convierte a una posición entera y la jerarquía completa a UN solo código
+# (DEPTO * ancho + MUNIC). Los conteos salen de np.bincount sobre ese código.
+#
+# IMPORTANTE: revisa con "import pandas as pd.py" cómo se llama la columna del
+# municipio en el CSV. Si el CSV no la trae, 01_procesar_datos.py sigue como siempre.
+
+COLUMNA_MUNICIPIO = 'MUNIC'
+
+# Nivel -> {clave: código máximo}. Cada nivel incluye las claves del nivel superior.
+NIVELES = {
+    'depto': {'DEPTO': 15},
+    'municipio': {'DEPTO': 15, COLUMNA_MUNICIPIO: 99},
+}
+
+COLUMNAS_MUNICIPIOS = COLUMNAS_CENSO + [COLUMNA_MUNICIPIO]
+
+
+def _metricas_territoriales(df):
+    # Conteos (vectores 0/1) que se suman por territorio; los filtros de edad van
+    # aquí porque la edad no es clave (a diferencia de la tabla base)
+    persona = df['COD_PER'].notna().to_numpy()
+    edad = df['P02_3_EDAD'].to_numpy(dtype='float64', na_value=np.nan)
+    sexo = df['P02_2_SEXO']
+    metricas = {
+        'Registros': np.ones(len(df), dtype='int64'),
+        'Poblacion': persona,
+        'Mujeres': persona & sexo.eq(2).fillna(False).to_numpy(),
+        'Hombres': persona & sexo.eq(1).fillna(False).to_numpy(),
+        'Poblacion_4plus': persona & (edad >= 4),
+        'Hablantes_Ingles': (edad >= 4) & es_si(df['P12_3_A_ENG']).to_numpy().astype(bool),
+        'Total_Pob_10plus': persona & (edad >= 10),
+    }
+    for col_censo, nombre in variables_tic.items():
+        metricas[nombre] = (edad >= 10) & es_si(df[col_censo]).to_numpy().astype(bool)
+    return metricas
+
+
+def codificar_jerarquia(df, claves):
+    # Un código entero por fila para toda la jerarquía. Cada clave ocupa 0..máximo y
+    # la posición máximo+1 guarda vacíos/fuera de rango (como dropna=False).
+    codigo = np.zeros(len(df), dtype='int64')
+    for clave, maximo in claves.items():
+        valores = df[clave].to_numpy(dtype='int64', na_value=-1)
+        posicion = np.where((valores >= 0) & (valores <= maximo), valores, maximo + 1)
+        codigo = codigo * (maximo + 2) + posicion
+    return codigo
+
+
+def _decodificar(codigos, claves):
+    # Inverso de codificar_jerarquia: código -> una columna por clave (vacío = <NA>)
+    columnas = {}
+    for clave, maximo in reversed(list(claves.items())):
+        posicion = codigos % (maximo + 2)
+        codigos = codigos // (maximo + 2)
+        columnas[clave] = pd.array(np.where(posicion <= maximo, posicion, 0), dtype='Int16')
+        columnas[clave][posicion > maximo] = pd.NA
+    if len(claves) == 1:
+        # Una sola clave: índice simple (un MultiIndex de un nivel no sobrevive a pd.concat)
+        clave = next(iter(claves))
+        return pd.Index(columnas[clave], name=clave)
+    return pd.MultiIndex.from_arrays([columnas[c] for c in claves], names=list(claves))
+
+
+def sumar_por_territorio(df, metricas, nivel='municipio'):
+    # {nombre: vector 0/1} -> tabla de conteos indexada por las claves del nivel
+    # (solo territorios presentes)
+    claves = NIVELES[nivel]
+    codigo = codificar_jerarquia(df, claves)
+    # np.unique compacta los códigos presentes (unos cientos) antes del bincount
+    presentes, inverso = np.unique(codigo, return_inverse=True)
+    tabla = {nombre: np.bincount(inverso, weights=valores, minlength=len(presentes)).astype('int64')
+             for nombre, valores in metricas.items()}
+    return pd.DataFrame(tabla, index=_decodificar(presentes, claves))
+
+
+def agregar_territorio_bloque(df, nivel='municipio'):
+    return sumar_por_territorio(df, _metricas_territoriales(df), nivel)
+
+
+# ==========================================
+# --- EN LA MISMA PASADA QUE LA TABLA BASE (O EL CUBO) ---
+# ==========================================
+def agregar_con_municipios(bloques, al_avanzar=None, reporte=SIN_REPORTE, agregador=agregar):
+    # Envuelve a agregar()/construir_cubo(): cada bloque que pasa también se suma por
+    # municipio. Devuelve ((resultado del agregador, tabla por municipio), total).
+    # La suma por municipio va en el aviso de avance (uno por bloque, DESPUÉS de agregarlo)
+    # y no dentro del generador: ahí correría dentro de la etapa 'carga' del agregador
+    # (se contaría dos veces y con --perfil habría dos perfiladores activos a la vez).
+    pendientes = []
+    municipios = [None]
+
+    def observar():
+        for bloque in bloques:
+            pendientes.append(bloque)
+            yield bloque
+
+    def avanzar(i, total):
+        bloque = pendientes.pop()
+        with reporte.etapa('municipios', filas_entrada=len(bloque)) as e:
+            municipios[0] = acumular(municipios[0], agregar_territorio_bloque(bloque))
+            e['filas_salida'] = len(municipios[0])
+        if al_avanzar:
+            al_avanzar(i, total)
+
+    resultado, total = agregador(observar(), avanzar, reporte)
+    return (resultado, municipios[0]), total
+
+
+def combinar_con_municipios(acumulado, parcial, combinar=acumular):
+    # Para agregar_en_paralelo (con functools.partial si el agregador no es agregar())
+    if acumulado is None:
+        return parcial
+    return combinar(acumulado[0], parcial[0]), acumular(acumulado[1], parcial[1])
+
+
+# ==========================================
+# --- RESUMEN POR MUNICIPIO ---
+# ==========================================
+def resumen_municipios(tabla):
+    # Municipios con depto asignado; mismas definiciones que los resúmenes por depto
+    tabla = tabla.reset_index()
+    resumen = tabla[tabla['DEPTO'].notna()].drop(columns='Registros').copy()
+    resumen['Pct_Ingles'] = (resumen['Hablantes_Ingles'] / resumen['Poblacion_4plus']) * 100
+    for col in variables_tic.values():
+        resumen[f'Pct_{col}'] = (resumen[col] / resumen['Total_Pob_10plus']) * 100
+    resumen['Nombre_Depto'] = etiquetar(resumen['DEPTO'], 'DEPTO')
+    return resumen.sort_values(['DEPTO', COLUMNA_MUNICIPIO], na_position='last').reset_index(drop=True)
@@ -0,0 +1,166 @@
+# %%
+import numpy as np
+
+from censo_carga import acumular, es_si, leer_censo_por_bloques
+from censo_diccionario import etiquetar
+from censo_instrumentacion import SIN_REPORTE
+from censo_territorio import sumar_por_territorio
+
+# ==========================================
+# --- VIVIENDA: JOIN DE LA BASE DE VIVIENDAS CON LA DE POBLACIÓN ---
+# ==========================================
+# Agua, luz, piso, paredes, techo e internet del hogar vienen en OTRO CSV (una fila por
+# vivienda). Para contar PERSONAS con esos servicios hay que unirlo con los ~6M de
+# personas por la llave de la vivienda. Sin pd.merge (que copiaría las dos tablas):
+#   1. "build": se lee la base de viviendas por bloques y se guarda SOLO la llave (int64)
+#      y un byte con los indicadores (un bit por indicador) -> ~9 bytes por vivienda.
+#   2. Índice: llaves ordenadas (búsqueda binaria con np.searchsorted) o, si las llaves
+#      son casi consecutivas (lo normal), una tabla de acceso directo llave -> byte.
+#   3. "probe": las personas pasan por bloques (CSV o Parquet), cada bloque busca sus
+#      llaves en el índice de una vez y se suma por depto. La RAM no depende del censo.
+#
+# IMPORTANTE: revisa con "import pandas as pd.py" el nombre de la llave y los códigos de
+# cada variable en los dos CSV (ver censo_diccionario.py).
+
+LLAVE_VIVIENDA = 'ID_VIV'
+
+# Indicador -> (columna de la base de vivienda, códigos que cuentan como "sí")
+INDICADORES_VIVIENDA = {
+    'Agua_Caneria': ('AGUA', [1, 2]),
+    'Electricidad': ('LUZ', [1]),
+    'Piso_Adecuado': ('PISO', [1, 2, 3, 4, 5, 6, 7, 8]),    # todo menos tierra
+    'Pared_Adecuada': ('PARED', [1, 2]),
+    'Techo_Adecuado': ('TECHO', [1, 2, 3]),
+    'Internet_Hogar': ('INTERNET', [1]),
+}
+# Los indicadores van empacados en un byte
+if len(INDICADORES_VIVIENDA) > 8:
+    raise ValueError(f"INDICADORES_VIVIENDA tiene {len(INDICADORES_VIVIENDA)} indicadores; caben 8 en un byte")
+
+COLUMNAS_VIVIENDA = [LLAVE_VIVIENDA, 'DEPTO'] + list(dict.fromkeys(c for c, _ in INDICADORES_VIVIENDA.values()))
+# Columnas de la base de población que necesita el "probe"
+COLUMNAS_PERSONAS = ['DEPTO', 'COD_PER', 'P02_3_EDAD', 'P14_6_USO_TIC_INTERNET', LLAVE_VIVIENDA]
+
+# Acceso directo si el rango de llaves es a lo más esto x número de viviendas
+# (la tabla usa 2 bytes por llave posible)
+FACTOR_DENSIDAD = 4
+
+
+def _bit(nombre):
+    return list(INDICADORES_VIVIENDA).index(nombre)
+
+
+def _llaves(df):
+    # Llaves vacías -> -1 (nunca se encuentran)
+    return df[LLAVE_VIVIENDA].to_numpy(dtype='int64', na_value=-1)
+
+
+class IndiceVivienda:
+    # Lado "build" del join: llave -> byte de indicadores, sin DataFrame ni índice de pandas
+    def __init__(self, llaves, bits):
+        orden = np.argsort(llaves, kind='stable')
+        llaves, bits = llaves[orden], bits[orden]
+        unicas = np.r_[True, llaves[1:] != llaves[:-1]] if len(llaves) else np.zeros(0, dtype=bool)
+        self.duplicadas = int((~unicas).sum())            # se queda la primera aparición
+        self.llaves, self.bits = llaves[unicas], bits[unicas]
+
+        self.directo = None
+        if len(self.llaves) and self.llaves[0] >= 0 and self.llaves[-1] < FACTOR_DENSIDAD * len(self.llaves):
+            self.directo = np.full(self.llaves[-1] + 1, -1, dtype='int16')     # -1 = no existe
+            self.directo[self.llaves] = self.bits
+
+    def __len__(self):
+        return len(self.llaves)
+
+    def buscar(self, llaves):
+        # Devuelve (encontrada, bits) para un arreglo de llaves, sin bucles de Python
+        if self.directo is not None:
+            dentro = (llaves >= 0) & (llaves < len(self.directo))
+            valor = np.full(len(llaves), -1, dtype='int16')
+            valor[dentro] = self.directo[llaves[dentro]]
+            encontrada = valor >= 0
+            return encontrada, np.where(encontrada, valor, 0).astype('uint8')
+        if not len(self.llaves):
+            return np.zeros(len(llaves), dtype=bool), np.zeros(len(llaves), dtype='uint8')
+        posicion = np.minimum(np.searchsorted(self.llaves, llaves), len(self.llaves) - 1)
+        encontrada = self.llaves[posicion] == llaves
+        return encontrada, np.where(encontrada, self.bits[posicion], 0).astype('uint8')
+
+
+# --- 1. BUILD: BASE DE VIVIENDAS ---
+def _bits_vivienda(df):
+    bits = np.zeros(len(df), dtype='uint8')
+    for i, (columna, codigos) in enumerate(INDICADORES_VIVIENDA.values()):
+        bits |= df[columna].isin(codigos).fillna(False).to_numpy(dtype='uint8') << i
+    return bits
+
+
+def construir_indice(vivienda_path, reporte=SIN_REPORTE):
+    # Devuelve (IndiceVivienda, conteos de viviendas por depto). Los conteos por vivienda
+    # salen aquí mismo: no necesitan el join.
+    llaves, bits, viviendas = [], [], None
+    for bloque in leer_censo_por_bloques(vivienda_path, COLUMNAS_VIVIENDA):
+        with reporte.etapa('vivienda_indice', filas_entrada=len(bloque)):
+            bits_bloque = _bits_vivienda(bloque)
+            metricas = {'Viviendas': np.ones(len(bloque), dtype='int64')}
+            for i, nombre in enumerate(INDICADORES_VIVIENDA):
+                metricas[nombre] = (bits_bloque >> i) & 1
+            viviendas = acumular(viviendas, sumar_por_territorio(bloque, metricas, 'depto'))
+            con_llave = bloque[LLAVE_VIVIENDA].notna().to_numpy()
+            llaves.append(_llaves(bloque)[con_llave])
+            bits.append(bits_bloque[con_llave])
+    with reporte.etapa('vivienda_indice_orden'):
+        indice = IndiceVivienda(np.concatenate(llaves) if llaves else np.zeros(0, dtype='int64'),
+                                np.concatenate(bits) if bits else np.zeros(0, dtype='uint8'))
+    return indice, viviendas
+
+
+# --- 2. PROBE: PERSONAS ---
+def _metricas_personas(indice, df):
+    persona = df['COD_PER'].notna().to_numpy()
+    edad = df['P02_3_EDAD'].to_numpy(dtype='float64', na_value=np.nan)
+    encontrada, bits = indice.buscar(_llaves(df))
+    enlazada = persona & encontrada
+    metricas = {'Personas': persona, 'Personas_Enlazadas': enlazada}
+    for i, nombre in enumerate(INDICADORES_VIVIENDA):
+        metricas[f'Pob_{nombre}'] = enlazada & ((bits >> i) & 1).astype(bool)
+    # Conectividad: uso personal de internet (10+ años) vs conexión en el hogar
+    usa_internet = enlazada & (edad >= 10) & es_si(df['P14_6_USO_TIC_INTERNET']).to_numpy().astype(bool)
+    metricas['Pob_10plus_Enlazada'] = enlazada & (edad >= 10)
+    metricas['Usa_Internet'] = usa_internet
+    metricas['Usa_Internet_Sin_Conexion'] = usa_internet & ~((bits >> _bit('Internet_Hogar')) & 1).astype(bool)
+    return metricas
+
+
+def sondear_personas(indice, bloques, reporte=SIN_REPORTE):
+    personas = None
+    for bloque in bloques:
+        with reporte.etapa('vivienda_join', filas_entrada=len(bloque)):
+            personas = acumular(personas, sumar_por_territorio(bloque, _metricas_personas(indice, bloque), 'depto'))
+    return personas
+
+
+# --- 3. RESUMEN POR DEPTO ---
+def resumen_vivienda(viviendas, personas):
+    tabla = viviendas.join(personas, how='outer').fillna(0).astype('int64').reset_index()
+    tabla = tabla[tabla['DEPTO'].notna()].copy()
+    for nombre in INDICADORES_VIVIENDA:
+        tabla[f'Pct_{nombre}'] = (tabla[nombre] / tabla['Viviendas']) * 100
+        tabla[f'Pct_Pob_{nombre}'] = (tabla[f'Pob_{nombre}'] / tabla['Personas_Enlazadas']) * 100
+    tabla['Personas_por_Vivienda'] = tabla['Personas_Enlazadas'] / tabla['Viviendas']
+    tabla['Pct_Personas_Sin_Vivienda'] = ((tabla['Personas'] - tabla['Personas_Enlazadas']) / tabla['Personas']) * 100
+    # De quienes usan internet, cuántos NO tienen conexión en su casa (celular, trabajo, cíber...)
+    tabla['Pct_Internet_Fuera_Del_Hogar'] = (tabla['Usa_Internet_Sin_Conexion'] / tabla['Usa_Internet']) * 100
+    tabla.insert(1, 'Nombre_Depto', etiquetar(tabla['DEPTO'], 'DEPTO'))
+    return tabla.sort_values('DEPTO').reset_index(drop=True)
+
+
+def procesar_vivienda(vivienda_path, bloques_personas, reporte=SIN_REPORTE):
+    # bloques_personas: iterador con COLUMNAS_PERSONAS (abrir_censo(..., columnas=COLUMNAS_PERSONAS))
+    indice, viviendas = construir_indice(vivienda_path, reporte)
+    print(f"🏠 Índice de viviendas: {len(indice):,} llaves"
+          f" ({'acceso directo' if indice.directo is not None else 'búsqueda binaria'})")
+    if indice.duplicadas:
+        print(f"⚠️ {indice.duplicadas:,} llaves de vivienda repetidas (se usa la primera)")
+    personas = sondear_personas(indice, bloques_personas, reporte)
+    return resumen_vivienda(viviendas, personas)
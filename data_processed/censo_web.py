@@ -0,0 +1,198 @@
+# %%
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from censo_agregados import codigos_deptos, variables_tic
+from censo_diccionario import etiquetar
+from censo_recodificacion import recodificar, GRUPOS_EDAD
+
+# ==========================================
+# --- DATOS PARA DASHBOARDS INTERACTIVOS (QUARTO) ---
+# ==========================================
+# projects.qmd mostraba tres PNG de 300 dpi (~2 MB en total) que no se pueden filtrar.
+# Aquí se exportan los mismos indicadores por depto (y, con el cubo, sus conteos por sexo y
+# edad) como JSON compactos (unas decenas de KB) y el mapa de departamentos como TopoJSON
+# cuantizado; los gráficos se dibujan en el
+# navegador (celdas {ojs} de Quarto) con filtros por departamento, sexo y grupo de edad.
+#
+# Los archivos son deterministas (mismo dato -> mismos bytes: claves ordenadas, decimales
+# fijos, sin fechas) y solo se reescriben si cambiaron, así docs/ queda limpio en git.
+#
+# Uso:  python censo_web.py            (JSON + TopoJSON en data/CENSO2024/)
+#       python censo_web.py --arrow    (además .arrow para cargar con Arquero/DuckDB-wasm)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPTS_DIR, "CENSO")
+# Cubo de 01_procesar_datos.py --cubo (para los cruces por sexo y edad)
+CUBO_FILE = os.path.join(SCRIPTS_DIR, "CENSO_cubo", "cubo_censo.npz")
+# Carpeta junto a los .qmd: Quarto la copia a docs/ al publicar
+WEB_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "data", "CENSO2024")
+
+DECIMALES = 2
+# Cuantización del TopoJSON: 10.000 pasos por eje (~20 m en El Salvador) sobra para la web
+CUANTIZACION = 10_000
+
+
+# --- FORMATO: JSON POR COLUMNAS ---
+def _columna(serie):
+    # Enteros como enteros, decimales redondeados, vacíos como null
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return [None if pd.isna(v) else int(v) for v in serie]
+    if pd.api.types.is_float_dtype(serie.dtype):
+        return [None if pd.isna(v) else round(float(v), DECIMALES) for v in serie]
+    return [None if pd.isna(v) else str(v) for v in serie]
+
+
+def tabla_a_json(df):
+    # {"columnas": [...], "datos": {col: [...]}}: los nombres no se repiten en cada fila
+    return {'columnas': list(df.columns), 'datos': {c: _columna(df[c]) for c in df.columns}}
+
+
+def serializar(objeto):
+    return json.dumps(objeto, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def escribir_si_cambio(ruta, contenido):
+    # Devuelve True si se escribió (el archivo no existía o era distinto)
+    if os.path.exists(ruta):
+        with open(ruta, 'rb') as f:
+            if f.read() == contenido:
+                return False
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'wb') as f:
+        f.write(contenido)
+    return True
+
+
+# --- TABLAS ---
+def tabla_deptos():
+    # Una fila por depto con demografía, inglés y TIC (lo que piden los filtros por depto)
+    deptos = pd.read_csv(os.path.join(DATA_DIR, "resumen_deptos.csv"))
+    ingles = pd.read_csv(os.path.join(DATA_DIR, "resumen_ingles.csv"))
+    tic = pd.read_csv(os.path.join(DATA_DIR, "resumen_tic_completo.csv"))
+    tabla = (deptos.drop(columns='Nombre_Depto')
+             .merge(ingles.drop(columns='Nombre_Depto'), on='DEPTO', how='left')
+             .merge(tic.drop(columns='Nombre_Depto'), on='DEPTO', how='left'))
+    tabla = tabla[tabla['DEPTO'].isin(codigos_deptos)].sort_values('DEPTO')
+    tabla.insert(1, 'Nombre_Depto', etiquetar(tabla['DEPTO'], 'DEPTO'))
+    return tabla.reset_index(drop=True)
+
+
+def tabla_cruces(cubo):
+    # Depto x Sexo x Grupo de edad, con personas, inglés y cada TIC (conteos, no %:
+    # así el navegador puede sumar cualquier combinación de filtros y dividir al final)
+    filtro = {'DEPTO': list(codigos_deptos), 'COD_PER_VALIDO': [1]}
+    por = ['DEPTO', 'SEXO', 'EDAD']
+    tabla = cubo.consultar(por, filtro).rename('Personas').to_frame()
+    for dimension in ['INGLES'] + list(variables_tic.values()):
+        tabla[dimension] = cubo.consultar(por, {**filtro, dimension: [1]})
+    tabla = tabla.fillna(0).astype('int64').reset_index()
+    tabla = tabla[tabla['EDAD'].notna()]
+    tabla['Grupo_Edad'] = recodificar(tabla['EDAD'], GRUPOS_EDAD)
+    tabla = tabla.rename(columns={'INGLES': 'Ingles'})
+    tabla = tabla.groupby(['DEPTO', 'SEXO', 'Grupo_Edad'], as_index=False).sum(numeric_only=True)
+    return tabla.drop(columns='EDAD').sort_values(['DEPTO', 'SEXO', 'Grupo_Edad']).reset_index(drop=True)
+
+
+# --- TOPOJSON ---
+def _anillos(geometria):
+    # Polygon/MultiPolygon -> lista de polígonos, cada uno lista de anillos (coordenadas)
+    poligonos = geometria.geoms if geometria.geom_type == 'MultiPolygon' else [geometria]
+    return [[np.asarray(p.exterior.coords)] + [np.asarray(i.coords) for i in p.interiors] for p in poligonos]
+
+
+def a_topojson(gdf, propiedades, objeto='deptos'):
+    # TopoJSON cuantizado con coordenadas delta (un arco por anillo). Las geometrías ya
+    # vienen simplificadas por cobertura (censo_geometria), así que los bordes coinciden.
+    x0, y0, x1, y1 = gdf.total_bounds
+    escala = [(x1 - x0) / (CUANTIZACION - 1) or 1, (y1 - y0) / (CUANTIZACION - 1) or 1]
+    arcos, geometrias = [], []
+    for geometria, props in zip(gdf.geometry, gdf[propiedades].to_dict('records')):
+        poligonos = []
+        for anillos in _anillos(geometria):
+            indices = []
+            for coords in anillos:
+                q = np.round((coords[:, :2] - [x0, y0]) / escala).astype('int64')
+                q = q[np.r_[True, (np.diff(q, axis=0) != 0).any(axis=1)]]   # puntos repetidos al cuantizar
+                delta = np.vstack([q[:1], np.diff(q, axis=0)])
+                indices.append(len(arcos))
+                arcos.append(delta.tolist())
+            poligonos.append([[i] for i in indices])        # un anillo = un arco
+        props = {k: (v.item() if hasattr(v, 'item') else v) for k, v in props.items()}
+        geometrias.append({'type': 'MultiPolygon', 'arcs': poligonos, 'properties': props})
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [round(e, 10) for e in escala], 'translate': [round(x0, 10), round(y0, 10)]},
+        'objects': {objeto: {'type': 'GeometryCollection', 'geometries': geometrias}},
+        'arcs': arcos,
+    }
+
+
+def topojson_deptos():
+    from censo_geometria import cargar_mapa, normalizar
+    gdf = cargar_mapa(nivel=1)
+    codigos = {normalizar(nombre): codigo for codigo, nombre in codigos_deptos.items()}
+    gdf = gdf.assign(DEPTO=gdf['match_key'].map(codigos)).dropna(subset=['DEPTO'])
+    gdf['DEPTO'] = gdf['DEPTO'].astype(int)
+    gdf['Nombre_Depto'] = gdf['DEPTO'].map(codigos_deptos)
+    return a_topojson(gdf.sort_values('DEPTO'), ['DEPTO', 'Nombre_Depto'])
+
+
+# --- EXPORTAR ---
+def construir_payloads():
+    # Nombre de archivo -> tabla (DataFrame) o documento (dict) ya listo.
+    # Solo lo que leen las celdas {ojs} de projects.qmd (los opcionales van en el manifiesto)
+    payloads = {'deptos.json': tabla_deptos()}
+    if os.path.exists(CUBO_FILE):
+        from censo_cubo import CuboCenso
+        payloads['cruces.json'] = tabla_cruces(CuboCenso.cargar(CUBO_FILE))
+    else:
+        print(f"⚠️ Sin cubo ({CUBO_FILE}): no hay filtros por sexo/edad. Corre 01_procesar_datos.py --cubo")
+    try:
+        payloads['deptos.topojson'] = topojson_deptos()
+    except (ImportError, OSError) as e:
+        print(f"⚠️ No se pudo generar el mapa TopoJSON ({e})")
+    return payloads
+
+
+def _arrow(df):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    sink = pa.BufferOutputStream()
+    tabla = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    with ipc.new_file(sink, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    return sink.getvalue().to_pybytes()
+
+
+def exportar(web_dir=WEB_DIR, arrow=False):
+    archivos = {}
+    for nombre, contenido in construir_payloads().items():
+        if isinstance(contenido, pd.DataFrame):
+            if arrow:
+                archivos[nombre.replace('.json', '.arrow')] = _arrow(contenido)
+            contenido = tabla_a_json(contenido)
+        archivos[nombre] = serializar(contenido)
+
+    # Manifiesto con el hash de cada archivo (para invalidar la caché del navegador)
+    manifiesto = {n: hashlib.sha256(c).hexdigest()[:16] for n, c in sorted(archivos.items())}
+    archivos['manifiesto.json'] = serializar(manifiesto)
+
+    for nombre, contenido in sorted(archivos.items()):
+        cambio = escribir_si_cambio(os.path.join(web_dir, nombre), contenido)
+        print(f"{'💾' if cambio else '⏭️ '} {nombre:<18} {len(contenido) / 1024:7.1f} KB"
+              f"{'' if cambio else ' (sin cambios)'}")
+    return archivos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta los resúmenes del censo para los gráficos interactivos")
+    parser.add_argument("--arrow", action="store_true", help="Además de JSON, tablas en formato Arrow IPC")
+    parser.add_argument("--destino", default=WEB_DIR)
+    args = parser.parse_args()
+    exportar(args.destino, args.arrow)
@@ -1,15 +1,30 @@
-import pandas as pd
+from censo_carga import leer_metadata_parquet, leer_encabezado
+from censo_diccionario import DICCIONARIO, describir_columnas
 
 # Ruta al archivo GIGANTE
 file_path = r"Z:\CENSO_2024\Bases-Finales-CPV2024SV-CSV\BasedeDatosdePoblacionCPV2024SV.csv"
+# Copia Parquet que crea 01_procesar_datos.py (guarda la lista de columnas del CSV)
+parquet_folder = r"C:\Users\wyane\OneDrive\Escritorio\WebPage\data_processed\CENSO_parquet"
 
 print("🕵️‍♂️ Buscando variables de Vivienda y Tecnología...")
 
-# Leemos solo los encabezados (0 filas) para ser instantáneo
-df_head = pd.read_csv(file_path, nrows=0)
-todas_las_cols = df_head.columns.tolist()
-
-# Palabras clave a buscar
+# Si ya existe el Parquet, las columnas vienen en su metadata (ni se toca el Z:)
+metadata = leer_metadata_parquet(parquet_folder)
+if metadata:
+    todas_las_cols = metadata['columnas_csv']
+else:
+    # Leemos solo los encabezados (0 filas) para ser instantáneo (sirve también con .gz/.zip/.zst)
+    todas_las_cols = leer_encabezado(file_path)
+
+# Primero: qué dice el diccionario (censo_diccionario.py) de las variables que ya usamos
+presentes, faltantes, sin_declarar = describir_columnas(todas_las_cols)
+print(f"\n--- VARIABLES DEL DICCIONARIO ({len(presentes)} presentes) ---")
+for col in presentes:
+    print(f" ✅ {col}: {DICCIONARIO[col]['descripcion']}")
+for col in faltantes:
+    print(f" ❌ {col} no está en el CSV: {DICCIONARIO[col]['descripcion']}")
+
+# Palabras clave a buscar (solo entre las columnas que el diccionario todavía no declara)
 keywords = ['INTERNET', 'WIFI', 'CONEXION', # Tecnología
             'COMPU', 'ORDENADOR', 'LAPTOP', 'TABLET', # Dispositivos
             'CELULAR', 'TELEFONO', # Comunicación
@@ -17,10 +32,10 @@ keywords = ['INTERNET', 'WIFI', 'CONEXION', # Tecnología
             'LUZ', 'ELECTRICIDAD', 'ALUMBRADO', # Energía
             'PISO', 'PARED', 'TECHO'] # Materiales
 
-print(f"\n--- COLUMNAS ENCONTRADAS ({len(todas_las_cols)} total) ---")
+print(f"\n--- COLUMNAS ENCONTRADAS ({len(todas_las_cols)} total, {len(sin_declarar)} sin declarar) ---")
 
 encontradas = []
-for col in todas_las_cols:
+for col in sin_declarar:
     for key in keywords:
         if key in col.upper():
             encontradas.append(col)
@@ -33,4 +48,4 @@ for col in encontradas:
 if not encontradas:
     print("❌ No encontré nada obvio. Quizás usan códigos como V01, H05, etc.")
     print("Aquí te van las primeras 50 columnas para que veas el patrón:")
-    print(todas_las_cols[:50])
\ No newline at end of file
+    print(sin_declarar[:50])
\ No newline at end of file